@@ -0,0 +1,174 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted before its deadline."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter driven by an EWMA of compile latency.
+
+    The limit grows by roughly one slot per "round" of requests while the
+    smoothed latency stays within ``tolerance`` times the no-load baseline,
+    and is cut multiplicatively as soon as latency drifts past it. Requests
+    beyond the current limit wait in line until ``queue_timeout`` expires.
+    """
+
+    def __init__(
+        self,
+        initial_limit=4,
+        min_limit=1,
+        max_limit=32,
+        queue_timeout=10.0,
+        max_queue=None,
+        tolerance=2.0,
+        smoothing=0.2,
+        backoff=0.9,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.backoff = backoff
+
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiting = 0
+        self._ewma = None
+        self._baseline = None
+        self._admitted = 0
+        self._rejected = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    def retry_after(self):
+        """Seconds a rejected client should wait before trying again."""
+        latency = self._ewma if self._ewma is not None else 1.0
+        return max(1, int(math.ceil(latency)))
+
+    def acquire(self, timeout=None):
+        """Take a slot, waiting up to ``timeout`` seconds. Returns True on success."""
+        timeout = self.queue_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if self._in_flight >= self.limit and self.max_queue is not None:
+                if self._waiting >= self.max_queue:
+                    self._rejected += 1
+                    return False
+            self._waiting += 1
+            try:
+                while self._in_flight >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._rejected += 1
+                        return False
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._in_flight += 1
+            self._admitted += 1
+            return True
+
+    def release(self, latency, success=True):
+        """Return a slot and feed the observed latency into the controller."""
+        with self._cond:
+            saturated = self._in_flight >= self.limit
+            self._in_flight -= 1
+            if success:
+                self._observe(latency, saturated)
+            self._cond.notify_all()
+
+    def _observe(self, latency, saturated):
+        if self._ewma is None:
+            self._ewma = latency
+            self._baseline = latency
+            return
+
+        self._ewma = self.smoothing * latency + (1 - self.smoothing) * self._ewma
+        if latency < self._baseline:
+            self._baseline = latency
+        else:
+            # Let the baseline creep up slowly so one unusually fast compile
+            # does not pin the target forever.
+            self._baseline += 0.01 * (self._ewma - self._baseline)
+
+        if self._ewma > self._baseline * self.tolerance:
+            self._limit = max(self.min_limit, self._limit * self.backoff)
+        elif saturated:
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+    @contextmanager
+    def slot(self, timeout=None):
+        """Context manager that holds a slot and reports the elapsed time."""
+        if not self.acquire(timeout):
+            raise AdmissionRejected("Server is busy", self.retry_after())
+        start = time.monotonic()
+        success = False
+        try:
+            yield
+            success = True
+        finally:
+            self.release(time.monotonic() - start, success)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "latency_ewma": self._ewma,
+                "latency_baseline": self._baseline,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+            }
+
+
+class TokenBucketRateLimiter:
+    """Per-client token buckets refilled at ``rate`` tokens per second."""
+
+    def __init__(self, rate, burst, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def allow(self, client_id):
+        """Consume one token for ``client_id``.
+
+        Returns a ``(allowed, retry_after)`` tuple, where ``retry_after`` is the
+        number of seconds until a token becomes available.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(client_id, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self._buckets[client_id] = (tokens - 1, now)
+                allowed, retry_after = True, 0
+            else:
+                self._buckets[client_id] = (tokens, now)
+                allowed = False
+                retry_after = max(1, int(math.ceil((1 - tokens) / self.rate)))
+            if len(self._buckets) > self.max_clients:
+                self._prune(now)
+            return allowed, retry_after
+
+    def _prune(self, now):
+        # Buckets that have refilled completely carry no state worth keeping
+        full_after = self.burst / self.rate
+        for client_id, (_, updated) in list(self._buckets.items()):
+            if now - updated >= full_after:
+                del self._buckets[client_id]
@@ -1,17 +1,92 @@
+import hashlib
+import io
 import json
+import logging
 import os
+import re
 import shutil
 import tempfile
+import time
+import uuid
+import zipfile
 
 from flask import Flask, Response, g, jsonify, request, send_file
 from flask_cors import CORS
 
+from admission import AdaptiveLimiter, AdmissionRejected, TokenBucketRateLimiter
+from artifact_store import configured_store
+
 # Import functions from pdf_generation module
 from pdf_generation import escape_latex, generate_resume_pdf, sanitize_data
+from preflight import PreflightError
+from prerender import Prerenderer
+from profiling import profiler, valid_request_id
+from resource_monitor import TEMP_PREFIX, sample_resources
+from result_cache import ResultCache, cache_key
+from roster import generate_roster_pdf
+from scheduler import compile_scheduler
+from structured_logging import configure_logging, request_id_var
+from tex_engines import engine_registry
+from tracing import SPAN_KIND_SERVER, current_span, parse_traceparent, tracer
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+configure_logging(level=os.environ.get("LOG_LEVEL", "INFO").upper())
+logger = logging.getLogger("resume.app")
+
+# Admission control in front of the LaTeX compile path
+compile_limiter = AdaptiveLimiter(
+    initial_limit=int(os.environ.get("COMPILE_CONCURRENCY", 4)),
+    max_limit=int(os.environ.get("COMPILE_MAX_CONCURRENCY", 32)),
+    queue_timeout=float(os.environ.get("COMPILE_QUEUE_TIMEOUT", 10)),
+)
+
+# Byte-identical output for identical input, so ETags and caches work across workers
+REPRODUCIBLE_PDF = os.environ.get("REPRODUCIBLE_PDF", "1") == "1"
+
+# Finished PDFs by content hash, shared by downloads and speculative prerenders,
+# backed by an artifact store that every worker on the host reads and writes
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", 900))
+result_cache = ResultCache(
+    max_bytes=int(os.environ.get("RESULT_CACHE_MB", 64)) * 1024 * 1024,
+    ttl=RESULT_CACHE_TTL,
+    shared=configured_store(
+        "pdf",
+        max_bytes=int(os.environ.get("ARTIFACT_STORE_MB", 512)) * 1024 * 1024,
+        ttl=RESULT_CACHE_TTL,
+    ),
+)
+prerenderer = Prerenderer(
+    result_cache,
+    max_workers=int(os.environ.get("PRERENDER_WORKERS", 2)),
+    max_pending=int(os.environ.get("PRERENDER_MAX_PENDING", 32)),
+    reproducible=REPRODUCIBLE_PDF,
+)
+
+# Largest roster accepted by a single roster export
+ROSTER_MAX_RESUMES = int(os.environ.get("ROSTER_MAX_RESUMES", 500))
+
+# Roster exports hold a slot for a whole roster compile and split, so they are
+# admitted separately instead of skewing the per-resume latency target
+ROSTER_CONCURRENCY = int(os.environ.get("ROSTER_CONCURRENCY", 1))
+roster_limiter = AdaptiveLimiter(
+    initial_limit=ROSTER_CONCURRENCY,
+    max_limit=ROSTER_CONCURRENCY,
+    queue_timeout=compile_limiter.queue_timeout,
+)
+
+# Proxies in front of the app that append to X-Forwarded-For (the load balancer)
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", 1))
+
+# Optional per-client rate limiting, disabled unless RATE_LIMIT_PER_MINUTE is set
+rate_limiter = None
+if os.environ.get("RATE_LIMIT_PER_MINUTE"):
+    rate_limiter = TokenBucketRateLimiter(
+        rate=float(os.environ["RATE_LIMIT_PER_MINUTE"]) / 60.0,
+        burst=float(os.environ.get("RATE_LIMIT_BURST", 5)),
+    )
+
 # Sample data for testing
 sample_data = {
     "name": "Janani P",
@@ -102,6 +177,94 @@ sample_data = {
 }
 
 
+def client_id():
+    """Identify the caller for rate limiting from the address our proxies recorded.
+
+    Each trusted proxy appends the address it received the request from to
+    X-Forwarded-For, so only the last TRUSTED_PROXY_HOPS entries can be
+    believed; anything to their left is supplied by the client.
+    """
+    forwarded = [
+        entry.strip()
+        for entry in request.headers.get("X-Forwarded-For", "").split(",")
+        if entry.strip()
+    ]
+    if TRUSTED_PROXY_HOPS and len(forwarded) >= TRUSTED_PROXY_HOPS:
+        return forwarded[-TRUSTED_PROXY_HOPS]
+    return request.remote_addr or "unknown"
+
+
+def rate_limit_response():
+    """A 429 response if the caller is over its rate limit, else None."""
+    if rate_limiter is None:
+        return None
+    allowed, retry_after = rate_limiter.allow(client_id())
+    if allowed:
+        return None
+    response = jsonify({"error": "Rate limit exceeded"})
+    response.headers["Retry-After"] = str(retry_after)
+    return response, 429
+
+
+@app.before_request
+def start_request():
+    # Honour an upstream request id so logs and profiles can be correlated
+    request_id = request.headers.get("X-Request-ID")
+    g.request_id = request_id if valid_request_id(request_id) else uuid.uuid4().hex
+    g.request_started = time.monotonic()
+    request_id_var.set(g.request_id)
+
+    # Continue the caller's trace when it sent W3C trace context
+    g.trace_span = tracer.start_span(
+        f"{request.method} {request.path}",
+        parent=parse_traceparent(request.headers.get("traceparent")),
+        kind=SPAN_KIND_SERVER,
+        attributes={
+            "http.method": request.method,
+            "http.target": request.path,
+            "http.request_content_length": request.content_length,
+            "request_id": g.request_id,
+        },
+    )
+    g.trace_token = current_span.set(g.trace_span)
+
+    if profiler.enabled and profiler.should_profile(
+        request.headers.get("X-Profile-Token")
+    ):
+        profiler.start(g.request_id)
+
+
+@app.after_request
+def finish_request(response):
+    response.headers["X-Request-ID"] = g.request_id
+    response.headers["X-Trace-Id"] = g.trace_span.trace_id
+    g.trace_span.set_attribute("http.status_code", response.status_code)
+    if request.path.startswith("/api/generate-"):
+        logger.info(
+            "Request handled",
+            extra={
+                "path": request.path,
+                "status": response.status_code,
+                "duration_seconds": round(time.monotonic() - g.request_started, 4),
+            },
+        )
+    if profiler.enabled and profiler.current() is not None:
+        response.headers["X-Profile-Id"] = profiler.current().profile_id
+    return response
+
+
+@app.teardown_request
+def teardown_profile(exc):
+    if profiler.enabled:
+        profiler.finish()
+    span = g.pop("trace_span", None)
+    if span is not None:
+        if exc is not None:
+            span.set_error(f"{type(exc).__name__}: {exc}")
+        current_span.reset(g.pop("trace_token"))
+        span.end()
+
+
 # API routes
 @app.route("/")
 def home():
@@ -119,34 +282,207 @@ def generate_pdf():
         if not data:
             return jsonify({"error": "No data provided"}), 400
 
+        limited = rate_limit_response()
+        if limited:
+            return limited
+
+        # Optional page target: /api/generate-pdf?max_pages=1
+        max_pages = request.args.get("max_pages", type=int)
+        if "max_pages" in request.args and (max_pages is None or max_pages < 1):
+            return jsonify({"error": "max_pages must be a positive integer"}), 400
+
+        # Serve drafts already rendered by /api/prerender, or still rendering
+        key = cache_key(data, max_pages=max_pages) if max_pages else cache_key(data)
+        pdf_content = result_cache.get(key) or prerenderer.wait_for(
+            key, timeout=compile_limiter.queue_timeout
+        )
+        if pdf_content:
+            return pdf_response(pdf_content)
+
         # Create a temporary directory for output
-        temp_dir = tempfile.mkdtemp()
+        temp_dir = tempfile.mkdtemp(prefix=TEMP_PREFIX)
 
         # Generate the PDF - using the imported function
-        pdf_path = generate_resume_pdf(temp_dir, data)
+        with compile_limiter.slot():
+            pdf_path = generate_resume_pdf(
+                temp_dir, data, reproducible=REPRODUCIBLE_PDF, max_pages=max_pages
+            )
 
         if not pdf_path or not os.path.exists(pdf_path):
-            if temp_dir and os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
             return jsonify({"error": "Failed to generate PDF"}), 500
 
         # Read the file content
-        with open(pdf_path, "rb") as f:
-            pdf_content = f.read()
+        with tracer.span("read-back") as span:
+            with open(pdf_path, "rb") as f:
+                pdf_content = f.read()
+            span.set_attribute("pdf.bytes", len(pdf_content))
+
+        result_cache.put(key, pdf_content)
+        return pdf_response(pdf_content)
+
+    except AdmissionRejected as e:
+        return admission_rejected_response(e)
 
-        # Clean up the temporary directory
+    except PreflightError as e:
+        return preflight_error_response(e)
+
+    except Exception as e:
+        logger.exception("PDF generation raised an error")
+        return jsonify({"error": str(e)}), 500
+
+    finally:
+        # Clean up the temporary directory on every path, including worker aborts
         if temp_dir and os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
+            with tracer.span("cleanup"):
+                shutil.rmtree(temp_dir)
 
-        # Create response with PDF content
-        response = Response(pdf_content, mimetype="application/pdf")
-        response.headers["Content-Disposition"] = "attachment; filename=resume.pdf"
+
+def admission_rejected_response(error):
+    response = jsonify({"error": str(error)})
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response, 503
+
+
+def preflight_error_response(error):
+    # Field errors are the client's input; anything else is a template problem
+    if error.field:
+        return jsonify({"error": str(error), "field": error.field}), 400
+    logger.error("Rendered LaTeX failed preflight", extra={"tex_line": error.line})
+    return jsonify({"error": str(error), "line": error.line}), 500
+
+
+def pdf_response(pdf_content):
+    response = Response(pdf_content, mimetype="application/pdf")
+    response.headers["Content-Disposition"] = "attachment; filename=resume.pdf"
+    response.set_etag(hashlib.sha256(pdf_content).hexdigest())
+    return response
+
+
+@app.route("/api/prerender", methods=["POST"])
+def prerender():
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+
+    limited = rate_limit_response()
+    if limited:
+        return limited
+
+    # One pending draft per session; fall back to the client address
+    session_id = request.headers.get("X-Session-ID") or client_id()
+    status = prerenderer.submit(session_id, data)
+    if status == "dropped":
+        response = jsonify({"status": status})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+    return jsonify({"status": status}), 202
+
+
+@app.route("/api/generate-roster-pdf", methods=["POST"])
+def generate_roster():
+    temp_dir = None
+
+    try:
+        data = request.json
+        resumes = data.get("resumes") if isinstance(data, dict) else None
+        if not resumes or not isinstance(resumes, list):
+            return jsonify({"error": "No resumes provided"}), 400
+        if len(resumes) > ROSTER_MAX_RESUMES:
+            return (
+                jsonify({"error": f"At most {ROSTER_MAX_RESUMES} resumes per roster"}),
+                400,
+            )
+        split = bool(data.get("split"))
+
+        limited = rate_limit_response()
+        if limited:
+            return limited
+
+        temp_dir = tempfile.mkdtemp(prefix=TEMP_PREFIX)
+        with roster_limiter.slot():
+            result = generate_roster_pdf(temp_dir, resumes, split=split)
+        if not result:
+            return jsonify({"error": "Failed to generate roster PDF"}), 500
+
+        if split:
+            # Bundle the per-person PDFs into a single download
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+                for index, path in enumerate(result["split_paths"]):
+                    archive.write(path, roster_file_name(index, resumes[index]))
+            content, mimetype, filename = (
+                buffer.getvalue(),
+                "application/zip",
+                "roster.zip",
+            )
+        else:
+            with open(result["pdf_path"], "rb") as f:
+                content = f.read()
+            mimetype, filename = "application/pdf", "roster.pdf"
+
+        response = Response(content, mimetype=mimetype)
+        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
         return response
 
+    except AdmissionRejected as e:
+        return admission_rejected_response(e)
+
+    except PreflightError as e:
+        return preflight_error_response(e)
+
     except Exception as e:
+        logger.exception("Roster generation raised an error")
+        return jsonify({"error": str(e)}), 500
+
+    finally:
         if temp_dir and os.path.exists(temp_dir):
             shutil.rmtree(temp_dir)
-        return jsonify({"error": str(e)}), 500
+
+
+def roster_file_name(index, resume):
+    """File name for one person's PDF inside the roster archive."""
+    name = resume.get("name") if isinstance(resume, dict) else None
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", name or "").strip("-").lower()
+    return f"{index + 1:03d}-{slug or 'resume'}.pdf"
+
+
+@app.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    return jsonify(
+        {
+            "admission": compile_limiter.stats(),
+            "roster_admission": roster_limiter.stats(),
+            "scheduler": compile_scheduler.stats(),
+            "engines": engine_registry.stats(),
+            "result_cache": result_cache.stats(),
+            "prerender": prerenderer.stats(),
+        }
+    )
+
+
+@app.route("/api/self-check", methods=["GET"])
+def self_check():
+    # Counters that should stay flat over time; compare against work in flight
+    return jsonify(
+        {
+            "resources": sample_resources(),
+            "in_flight": {
+                "compiles": compile_limiter.stats()["in_flight"],
+                "prerenders": prerenderer.stats()["in_flight"],
+            },
+        }
+    )
+
+
+@app.route("/api/profiles/<profile_id>/<artifact>", methods=["GET"])
+def get_profile_artifact(profile_id, artifact):
+    if not profiler.authorized(request.headers.get("X-Profile-Token")):
+        return jsonify({"error": "Not found"}), 404
+
+    path = profiler.artifact_path(profile_id, artifact)
+    if path is None:
+        return jsonify({"error": "Not found"}), 404
+    return send_file(path, as_attachment=True)
 
 
 @app.route("/api/sample-data", methods=["GET"])
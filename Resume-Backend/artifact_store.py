@@ -0,0 +1,285 @@
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import re
+import shutil
+import stat
+import tempfile
+import threading
+import time
+
+from jinja2 import BytecodeCache
+
+logger = logging.getLogger("resume.artifact_store")
+
+# Keys are content hashes; anything else could escape the store directory
+_KEY_RE = re.compile(r"^[0-9a-f]{16,128}$")
+
+# Temporary files older than this were left behind by a crashed writer
+STALE_WRITE_SECONDS = 3600
+
+
+def _private_directory(path):
+    """Create ``path`` as a directory only this user can use, or check that it is one.
+
+    Artifacts include marshalled Jinja bytecode, which is executed when
+    loaded, so a directory another user can write to must not be used.
+    Raises PermissionError otherwise.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"Artifact directory is not owned by this user: {path}")
+    if info.st_mode & 0o022:
+        raise PermissionError(f"Artifact directory is writable by others: {path}")
+
+
+def _map_file(path):
+    """Contents and mtime of ``path``, copied straight out of the page cache."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        info = os.fstat(fd)
+        if info.st_size == 0:
+            return b"", info.st_mtime
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[:], info.st_mtime
+    finally:
+        os.close(fd)
+
+
+class ArtifactStore:
+    """Interface of a content-addressed artifact store shared between processes.
+
+    Keys are lowercase hex digests of the content they name, so an entry
+    never changes once written and concurrent writers of the same key are
+    harmless. Backends may drop entries at any time.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def put(self, key, content):
+        raise NotImplementedError
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        return {}
+
+
+class SharedDirectoryStore(ArtifactStore):
+    """Artifacts as files under ``root``, shared by every process that can see it.
+
+    All workers on a host share a local directory, and reads are memory
+    mapped so they come straight from the shared page cache; putting
+    ``root`` on a network filesystem shares it between hosts too.
+    Files are written under a temporary name and renamed into place, so
+    readers only ever see complete artifacts. Once ``max_bytes`` is exceeded,
+    the least recently used files are removed by whichever process gets the
+    sweep lock. Entries unused for ``ttl`` seconds expire. ``root`` must be
+    owned by the current user and not writable by anyone else; it is
+    created with mode 0700.
+    """
+
+    def __init__(self, root, max_bytes=512 * 1024 * 1024, ttl=None, sweep_fraction=0.1):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sweep_bytes = max(int(max_bytes * sweep_fraction), 1)
+        self._tmp_dir = os.path.join(root, "tmp")
+        self._written = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+        _private_directory(root)
+        os.makedirs(self._tmp_dir, exist_ok=True)
+
+    def _path(self, key):
+        if not _KEY_RE.match(key):
+            raise ValueError(f"Invalid artifact key: {key!r}")
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            content, modified = _map_file(path)
+        except FileNotFoundError:
+            content = None
+
+        expired = self.ttl is not None and content is not None
+        if expired and time.time() - modified > self.ttl:
+            self._unlink(path)
+            content = None
+        with self._lock:
+            if content is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        self._touch(path)
+        return content
+
+    def __contains__(self, key):
+        try:
+            modified = os.stat(self._path(key)).st_mtime
+        except FileNotFoundError:
+            return False
+        return self.ttl is None or time.time() - modified <= self.ttl
+
+    def put(self, key, content):
+        if len(content) > self.max_bytes:
+            return
+        path = self._path(key)
+        if os.path.exists(path):
+            # Same key, same content: just mark it as recently used
+            self._touch(path)
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._unlink(tmp_path)
+            logger.warning(
+                "Could not write artifact", extra={"key": key}, exc_info=True
+            )
+            return
+
+        with self._lock:
+            self._written += len(content)
+            due = self._written >= self.sweep_bytes
+            if due:
+                self._written = 0
+        if due:
+            self.sweep()
+
+    def sweep(self):
+        """Remove expired entries, then the least recently used ones above ``max_bytes``.
+
+        Only one process sweeps at a time; the others skip.
+        """
+        with open(os.path.join(self.root, ".sweep.lock"), "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            now = time.time()
+            entries, total = [], 0
+            for path, info in self._scan():
+                if self.ttl is not None and now - info.st_mtime > self.ttl:
+                    self._evict(path)
+                else:
+                    entries.append((info.st_mtime, info.st_size, path))
+                    total += info.st_size
+
+            # Evict down to 90% so the next few writes do not trigger another sweep
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes * 0.9:
+                    break
+                self._evict(path)
+                total -= size
+
+            # Writers rename files out of tmp/ without taking the sweep lock
+            for entry in os.scandir(self._tmp_dir):
+                try:
+                    stale = now - entry.stat().st_mtime > STALE_WRITE_SECONDS
+                except FileNotFoundError:
+                    continue
+                if stale:
+                    self._unlink(entry.path)
+
+    def _scan(self):
+        for shard in os.scandir(self.root):
+            if shard.is_dir() and shard.path != self._tmp_dir:
+                for entry in os.scandir(shard.path):
+                    try:
+                        yield entry.path, entry.stat()
+                    except FileNotFoundError:
+                        continue
+
+    def _evict(self, path):
+        if self._unlink(path):
+            with self._lock:
+                self._evictions += 1
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _unlink(self, path):
+        try:
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def clear(self):
+        for shard in os.scandir(self.root):
+            if shard.is_dir() and shard.path != self._tmp_dir:
+                shutil.rmtree(shard.path, ignore_errors=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+
+class StoreBytecodeCache(BytecodeCache):
+    """Jinja bytecode cache kept in an artifact store, so templates compile once per host."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def _key(self, bucket):
+        # Address by template source too, so an edited template gets a new entry
+        return hashlib.sha256(f"{bucket.key}:{bucket.checksum}".encode()).hexdigest()
+
+    def load_bytecode(self, bucket):
+        content = self.store.get(self._key(bucket))
+        if content is not None:
+            bucket.bytecode_from_string(content)
+
+    def dump_bytecode(self, bucket):
+        self.store.put(self._key(bucket), bucket.bytecode_to_string())
+
+    def clear(self):
+        self.store.clear()
+
+
+def configured_store(namespace, max_bytes, ttl=None, backend=None):
+    """Store for ``namespace`` per the ``ARTIFACT_STORE`` setting: "directory" or "none".
+
+    The directory backend lives under ``ARTIFACT_DIR``; returns None when disabled,
+    or when that directory could be tampered with by another user.
+    """
+    backend = backend or os.environ.get("ARTIFACT_STORE", "directory")
+    if backend == "none":
+        return None
+    if backend != "directory":
+        raise ValueError(f"Unknown ARTIFACT_STORE: {backend}")
+    root = os.environ.get(
+        "ARTIFACT_DIR", os.path.join(tempfile.gettempdir(), "resume-artifacts")
+    )
+    try:
+        _private_directory(root)
+        return SharedDirectoryStore(
+            os.path.join(root, namespace), max_bytes=max_bytes, ttl=ttl
+        )
+    except OSError as e:
+        logger.warning("Artifact store disabled", extra={"path": root, "error": str(e)})
+        return None
@@ -0,0 +1,135 @@
+"""Stand-in for pdflatex used for load testing and CI without a TeX installation.
+
+Accepts the same command line as the real engines, writes a small valid PDF
+and a ``.log`` next to it, and exits like pdflatex would. Behaviour is tuned
+through environment variables:
+
+- ``FAKE_TEX_LATENCY``: seconds to spend "compiling", or a ``min-max`` range
+- ``FAKE_TEX_FAILURE_RATE``: fraction of runs that fail with a TeX error
+- ``FAKE_TEX_MEMORY_MB``: memory to allocate and touch while running
+
+A document containing ``FAKE-TEX-HANG`` never finishes, to exercise timeouts.
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+_ROSTER_RE = re.compile(r"\\typeout\{ROSTER-PAGES:(\d+):")
+_LAYOUT_RE = re.compile(r"\\typeout\{RESUME-LAYOUT:")
+
+
+def parse_args(argv):
+    output_dir = "."
+    tex_file = None
+    args = iter(argv)
+    for arg in args:
+        if arg == "-output-directory":
+            output_dir = next(args)
+        elif arg.startswith("-output-directory="):
+            output_dir = arg.split("=", 1)[1]
+        elif not arg.startswith("-"):
+            tex_file = arg
+    return output_dir, tex_file
+
+
+def parse_latency(value):
+    if not value:
+        return 0.0
+    low, _, high = value.partition("-")
+    if high:
+        return random.uniform(float(low), float(high))
+    return float(low)
+
+
+def build_pdf(text, pages=1):
+    """Return a PDF showing ``text`` on each of ``pages`` pages, with a correct xref table."""
+    text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    kids = " ".join(f"{4 + 2 * page} 0 R" for page in range(pages)).encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for page in range(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text} {page + 1}) Tj ET".encode(
+            "latin-1", "replace"
+        )
+        objects += [
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (5 + 2 * page),
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+        ]
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b"%010d 00000 n \n" % offset
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\n" % (len(objects) + 1)
+    pdf += b"startxref\n%d\n%%%%EOF\n" % xref
+    return bytes(pdf)
+
+
+def main(argv):
+    output_dir, tex_file = parse_args(argv)
+    if tex_file is None:
+        print("! Emergency stop: no input file.")
+        return 1
+
+    stem = os.path.splitext(os.path.basename(tex_file))[0]
+    log_path = os.path.join(output_dir, stem + ".log")
+    with open(tex_file, encoding="utf-8", errors="replace") as f:
+        source = f.read()
+
+    ballast = None
+    memory_mb = int(os.environ.get("FAKE_TEX_MEMORY_MB", 0))
+    if memory_mb:
+        ballast = bytearray(memory_mb * 1024 * 1024)
+        # Touch every page so the memory is actually resident
+        for index in range(0, len(ballast), 4096):
+            ballast[index] = 1
+
+    time.sleep(parse_latency(os.environ.get("FAKE_TEX_LATENCY")))
+    if "FAKE-TEX-HANG" in source:
+        time.sleep(3600)
+
+    lines = ["This is FakeTeX, Version 3.141592653", f"({tex_file}"]
+    if random.random() < float(os.environ.get("FAKE_TEX_FAILURE_RATE", 0)):
+        lines += ["! Fake failure requested by FAKE_TEX_FAILURE_RATE.", "l.1 ", ""]
+        with open(log_path, "w") as f:
+            f.write("\n".join(lines))
+        print("\n".join(lines))
+        return 1
+
+    # Echo the roster page markers, one page per resume, so exports can be split
+    roster = _ROSTER_RE.findall(source)
+    for index in roster:
+        lines.append(f"ROSTER-PAGES:{index}:1")
+    # Report the single page as half full, so fitting to a page count is a no-op
+    if _LAYOUT_RE.search(source):
+        lines.append("RESUME-LAYOUT:1:341.0pt:682.0pt:0.0pt")
+
+    pages = max(len(roster), 1)
+    pdf = build_pdf(f"FakeTeX output for {stem}", pages)
+    with open(os.path.join(output_dir, stem + ".pdf"), "wb") as f:
+        f.write(pdf)
+    plural = "s" if pages > 1 else ""
+    lines.append(
+        f"Output written on {stem}.pdf ({pages} page{plural}, {len(pdf)} bytes)."
+    )
+    with open(log_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    print("\n".join(lines))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,40 @@
+# Gunicorn settings sized from the container's cgroup limits.
+# See serving_config.py for how each value is derived.
+from serving_config import current_rss, load_serving_config
+
+_config = load_serving_config()
+
+bind = "0.0.0.0:5001"
+worker_class = "gthread"
+workers = _config["workers"]
+threads = _config["threads"]
+preload_app = True
+
+# Recycle workers periodically and whenever they grow past the RSS watermark
+max_requests = _config["max_requests"]
+max_requests_jitter = _config["max_requests_jitter"]
+worker_rss_limit = _config["worker_rss_limit"]
+
+timeout = _config["timeout"]
+graceful_timeout = _config["graceful_timeout"]
+keepalive = _config["keepalive"]
+
+
+def on_starting(server):
+    server.log.info(f"Serving configuration: {_config}")
+
+
+def post_fork(server, worker):
+    # The app is preloaded in the master, whose background threads are not
+    # inherited; start the log writer and trace exporter again in the worker
+    from structured_logging import restart_logging
+    from tracing import tracer
+
+    restart_logging()
+    tracer.restart()
+
+
+def post_request(worker, req, environ, resp):
+    if worker_rss_limit and current_rss() > worker_rss_limit:
+        worker.log.info("Worker RSS above watermark, recycling")
+        worker.alive = False
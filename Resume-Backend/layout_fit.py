@@ -0,0 +1,99 @@
+import json
+import math
+import os
+import re
+
+from artifact_store import configured_store
+from result_cache import ResultCache
+
+# Written by twks_resume_template.tex at the end of the document:
+# last page number, height used on it, \textheight and total flexible spacing
+_LAYOUT_RE = re.compile(r"RESUME-LAYOUT:(\d+):([\d.]+)pt:([\d.]+)pt:([\d.]+)pt")
+
+# Font size and baseline skip (pt) of each article size command at 10pt
+ARTICLE_SIZES = [
+    ("tiny", 5, 6),
+    ("scriptsize", 7, 8),
+    ("footnotesize", 8, 9.5),
+    ("small", 9, 11),
+    ("normalsize", 10, 12),
+    ("large", 12, 14),
+    ("Large", 14.4, 18),
+    ("LARGE", 17.28, 22),
+    ("huge", 20.74, 25),
+    ("Huge", 24.88, 30),
+]
+
+# Limits on how far a layout is squeezed before giving up on the page target
+MIN_SPACING = 0.4
+MIN_FONT_SCALE = 0.8
+
+# Share of each page assumed usable; page breaks never fill pages exactly
+PAGE_FILL = 0.95
+
+# Measurements by content hash, so changing max_pages needs no measuring pass
+LAYOUT_CACHE_TTL = float(os.environ.get("LAYOUT_CACHE_TTL", 86400))
+measurement_cache = ResultCache(
+    max_bytes=int(os.environ.get("LAYOUT_CACHE_KB", 1024)) * 1024,
+    ttl=LAYOUT_CACHE_TTL,
+    shared=configured_store("layout", max_bytes=16 * 1024 * 1024, ttl=LAYOUT_CACHE_TTL),
+)
+
+
+def parse_layout_measurement(log_text):
+    """Natural layout of a compiled resume from its TeX log, or None."""
+    match = _LAYOUT_RE.search(log_text or "")
+    if not match:
+        return None
+    pages, last_page, text_height, spacing = match.groups()
+    pages, text_height = int(pages), float(text_height)
+    return {
+        "pages": pages,
+        "content_height": (pages - 1) * text_height + float(last_page),
+        "text_height": text_height,
+        "spacing_height": float(spacing),
+    }
+
+
+def cached_measurement(key):
+    content = measurement_cache.get(key)
+    return json.loads(content) if content else None
+
+
+def remember_measurement(key, measurement):
+    measurement_cache.put(key, json.dumps(measurement).encode("utf-8"))
+
+
+def fit_layout(measurement, max_pages):
+    """Spacing and font scale that fit ``measurement`` on ``max_pages`` pages.
+
+    Returns None when the natural layout already fits. Flexible spacing is
+    reduced first, down to MIN_SPACING, then fonts are scaled. Text height
+    is modelled as growing with the square of the font scale (smaller lines
+    that also hold more words), and em-based spacing linearly.
+    """
+    if measurement["pages"] <= max_pages:
+        return None
+
+    capacity = max_pages * measurement["text_height"] * PAGE_FILL
+    spacing = measurement["spacing_height"]
+    text = max(measurement["content_height"] - spacing, 1.0)
+
+    spacing_scale, font_scale = 1.0, 1.0
+    if spacing > 0:
+        spacing_scale = max((capacity - text) / spacing, MIN_SPACING)
+    if text + spacing_scale * spacing > capacity:
+        # Solve text * s^2 + spacing_scale * spacing * s = capacity for s
+        b = spacing_scale * spacing
+        font_scale = (-b + math.sqrt(b * b + 4 * text * capacity)) / (2 * text)
+        font_scale = max(font_scale, MIN_FONT_SCALE)
+
+    return {
+        "spacing_scale": round(min(spacing_scale, 1.0), 3),
+        "font_scale": round(font_scale, 3),
+        "font_sizes": [
+            (command, round(size * font_scale, 2), round(skip * font_scale, 2))
+            for command, size, skip in ARTICLE_SIZES
+            if font_scale < 1
+        ],
+    }
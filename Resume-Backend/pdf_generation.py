@@ -1,10 +1,44 @@
+import logging
 import os
 import re
 import subprocess
+import time
 from pathlib import Path
 
 from jinja2 import Environment, FileSystemLoader
 
+from artifact_store import StoreBytecodeCache, configured_store
+from layout_fit import (
+    cached_measurement,
+    fit_layout,
+    parse_layout_measurement,
+    remember_measurement,
+)
+from preflight import check_fields, check_tex_body, repair_text
+from profiling import profiler
+from reproducible import content_digest, normalize_pdf, reproducible_env
+from result_cache import cache_key
+from scheduler import compile_scheduler
+from structured_logging import parse_tex_error
+from tex_engines import DEFAULT_ENGINE, engine_registry
+from tracing import tracer
+
+logger = logging.getLogger("resume.pdf_generation")
+
+# Cap on how much pdflatex output is attached to a failure log entry
+MAX_OUTPUT_CHARS = 2000
+
+_PAGES_RE = re.compile(r"Output written on .*?\((\d+) pages?")
+
+# Compiled Jinja templates shared by every worker on the host
+_template_store = configured_store("templates", max_bytes=16 * 1024 * 1024)
+template_bytecode_cache = (
+    StoreBytecodeCache(_template_store) if _template_store else None
+)
+
+# Seconds before a runaway compile is killed
+COMPILE_TIMEOUT = float(os.environ.get("COMPILE_TIMEOUT", 60))
+
 
 def escape_latex(text):
     """Escape LaTeX special characters."""
@@ -12,45 +46,113 @@ def escape_latex(text):
         return ""
 
     conv = {
-        "&": r"\\&",
-        "%": r"\\%",
-        "$": r"\\$",
-        "#": r"\\#",
-        "_": r"\\_",
-        "{": r"\\{",
-        "}": r"\\}",
-        "~": r"\\textasciitilde{}",
-        "^": r"\\textasciicircum{}",
-        "\\\\": r"\\textbackslash{}",
+        "&": r"\&",
+        "%": r"\%",
+        "$": r"\$",
+        "#": r"\#",
+        "_": r"\_",
+        "{": r"\{",
+        "}": r"\}",
+        "~": r"\textasciitilde{}",
+        "^": r"\textasciicircum{}",
+        "\\": r"\textbackslash{}",
     }
     regex = re.compile("|".join(re.escape(str(key)) for key in conv.keys()))
     return regex.sub(lambda match: conv[match.group()], text)
 
 
-def compile_latex_to_pdf(tex_file, output_dir):
-    """Compile the LaTeX file to PDF."""
-    command = [
-        "pdflatex",
-        "-interaction=nonstopmode",
+def compile_latex_to_pdf(
+    tex_file,
+    output_dir,
+    priority="interactive",
+    engine=DEFAULT_ENGINE,
+    env=None,
+    timeout=None,
+):
+    """Compile the LaTeX file to PDF, queued under the given priority class.
+
+    The engine is killed after ``timeout`` seconds, COMPILE_TIMEOUT by default.
+    """
+    command = engine_registry.command(engine) + [
         "-output-directory",
         output_dir,
         tex_file,
     ]
-    result = subprocess.run(command, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"Error compiling LaTeX file {tex_file}:")
-        print(result.stdout)
-        print(result.stderr)
-        return False
+    with tracer.span("compile", engine=engine, priority=priority) as span:
+        with compile_scheduler.slot(priority):
+            start = time.monotonic()
+            timed_out = False
+            try:
+                result = subprocess.run(
+                    command,
+                    capture_output=True,
+                    text=True,
+                    env=env,
+                    timeout=timeout or COMPILE_TIMEOUT,
+                )
+            except subprocess.TimeoutExpired:
+                # subprocess.run has already killed and reaped the engine
+                result = subprocess.CompletedProcess(command, -9, "", "")
+                timed_out = True
+            duration = time.monotonic() - start
+
+        log_path = os.path.join(output_dir, Path(tex_file).stem + ".log")
+        span.set_attributes(
+            {
+                "tex.exit_code": result.returncode,
+                "tex.timed_out": timed_out,
+                "tex.seconds": round(duration, 4),
+            }
+        )
+        if tracer.enabled and result.returncode == 0:
+            span.set_attribute("pdf.pages", parse_page_count(_read_tex_log(log_path)))
+        profiler.record_compile(command, result.returncode, duration, log_path)
+        engine_registry.record(engine, duration, result.returncode == 0)
+        if result.returncode != 0:
+            span.set_error(f"{engine} exited with {result.returncode}")
+            tex_error = parse_tex_error(_read_tex_log(log_path) or result.stdout) or {}
+            logger.error(
+                "LaTeX compilation failed",
+                extra={
+                    "tex_file": tex_file,
+                    "engine": engine,
+                    "returncode": result.returncode,
+                    "timed_out": timed_out,
+                    "compile_seconds": round(duration, 3),
+                    "stderr": (result.stderr or "")[:MAX_OUTPUT_CHARS],
+                    **tex_error,
+                },
+            )
+            return False
+    logger.debug(
+        "LaTeX compilation finished",
+        extra={
+            "tex_file": tex_file,
+            "engine": engine,
+            "compile_seconds": round(duration, 3),
+        },
+    )
     return True
 
 
+def parse_page_count(log_text):
+    """Number of pages from the "Output written on" line of a TeX log, if present."""
+    match = _PAGES_RE.search(log_text or "")
+    return int(match.group(1)) if match else None
+
+
+def _read_tex_log(log_path):
+    try:
+        with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
 def sanitize_data(data):
     """Recursively escape special chars in data."""
     if isinstance(data, str):
-        # Special handling for C# language reference
-        data = data.replace("C#", "C\\#")
-        return escape_latex(data)
+        return escape_latex(repair_text(data))
     elif isinstance(data, list):
         return [sanitize_data(item) for item in data]
     elif isinstance(data, dict):
@@ -58,31 +160,137 @@ def sanitize_data(data):
     return data
 
 
-def generate_resume_pdf(output_dir, data, template_name="twks_resume_template.tex"):
-    """Generate a PDF from the resume data."""
+def _render_tex(template, data, layout=None):
+    with tracer.span(
+        "render", template=template.name, fitted=layout is not None
+    ) as span:
+        filled_tex = template.render({**data, "fit_layout": layout})
+        check_tex_body(filled_tex)
+        span.set_attribute("tex.bytes", len(filled_tex))
+    return filled_tex
+
+
+def resume_shape(data):
+    """Size attributes of a resume payload, for tracing."""
+    if not isinstance(data, dict):
+        return {}
+    experiences = [
+        experience
+        for key in ("thoughtworks_experiences", "other_experiences")
+        for experience in data.get(key) or []
+        if isinstance(experience, dict)
+    ]
+    return {
+        "resume.experiences": len(experiences),
+        "resume.descriptions": sum(
+            len(experience.get("descriptions") or []) for experience in experiences
+        ),
+    }
+
+
+def generate_resume_pdf(
+    output_dir,
+    data,
+    template_name="twks_resume_template.tex",
+    priority="interactive",
+    engine=None,
+    reproducible=False,
+    max_pages=None,
+):
+    """Generate a PDF from the resume data.
+
+    Unless an ``engine`` is given, pdflatex is used for inputs it can typeset
+    and the Unicode engine for the rest. Raises PreflightError for input that
+    is known to fail, without running TeX. With ``reproducible`` set, the same
+    input always produces byte-identical output. With ``max_pages`` set,
+    spacing and font size are reduced to fit, compiling at most twice.
+    """
+    timings = {}
+    start = time.monotonic()
+
     # Using Path to get the directory of the current file
     current_dir = os.path.dirname(os.path.abspath(__file__))
     env = Environment(
         loader=FileSystemLoader(os.path.join(current_dir, "templates")),
         autoescape=False,
+        bytecode_cache=template_bytecode_cache,
     )
     template = env.get_template(template_name)
+    timings["template_seconds"] = time.monotonic() - start
+
+    with tracer.span("sanitize", **resume_shape(data)) as span:
+        sanitized_data = sanitize_data(data)
+        if engine is None:
+            engine = engine_registry.select(sanitized_data)
+        check_fields(sanitized_data, engine)
+        span.set_attribute("tex.engine", engine)
+    timings["sanitize_seconds"] = time.monotonic() - start - sum(timings.values())
 
-    sanitized_data = sanitize_data(data)
-    filled_tex = template.render(**sanitized_data)
+    # With a page target, reuse the natural layout measured by an earlier compile
+    layout = measurement_key = measurement = None
+    if max_pages:
+        measurement_key = cache_key(data, template_name)
+        measurement = cached_measurement(measurement_key)
+        if measurement is not None:
+            layout = fit_layout(measurement, max_pages)
+
+    filled_tex = _render_tex(template, sanitized_data, layout)
+    timings["render_seconds"] = time.monotonic() - start - sum(timings.values())
 
     # Create a temporary directory for output
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     tex_path = os.path.join(output_dir, "resume.tex")
     pdf_path = tex_path.replace(".tex", ".pdf")
+    compile_env = reproducible_env() if reproducible else None
 
-    with open(tex_path, "w") as f:
+    with open(tex_path, "w", encoding="utf-8") as f:
         f.write(filled_tex)
+    timings["write_seconds"] = time.monotonic() - start - sum(timings.values())
+
+    success = compile_latex_to_pdf(
+        str(tex_path), output_dir, priority=priority, engine=engine, env=compile_env
+    )
+    timings["compile_seconds"] = time.monotonic() - start - sum(timings.values())
+
+    if success and max_pages and measurement is None:
+        # The first compile was the measuring pass; refit at most once
+        log_path = tex_path.replace(".tex", ".log")
+        measurement = parse_layout_measurement(_read_tex_log(log_path))
+        if measurement is not None:
+            remember_measurement(measurement_key, measurement)
+            layout = fit_layout(measurement, max_pages)
+        if layout is not None:
+            filled_tex = _render_tex(template, sanitized_data, layout)
+            with open(tex_path, "w", encoding="utf-8") as f:
+                f.write(filled_tex)
+            success = compile_latex_to_pdf(
+                str(tex_path),
+                output_dir,
+                priority=priority,
+                engine=engine,
+                env=compile_env,
+            )
+            timings["refit_seconds"] = time.monotonic() - start - sum(timings.values())
+
+    if success and reproducible:
+        with open(pdf_path, "rb") as f:
+            content = f.read()
+        with open(pdf_path, "wb") as f:
+            f.write(normalize_pdf(content, content_digest(filled_tex)))
+    timings = {stage: round(seconds, 4) for stage, seconds in timings.items()}
 
-    success = compile_latex_to_pdf(str(tex_path), output_dir)
     if success:
-        print(f"✅ PDF successfully generated at: {pdf_path}")
+        if layout is not None:
+            timings.update(
+                font_scale=layout["font_scale"], spacing_scale=layout["spacing_scale"]
+            )
+        logger.info(
+            "PDF generated", extra={"priority": priority, "engine": engine, **timings}
+        )
         return pdf_path
     else:
-        print("❌ Failed to generate PDF.")
+        logger.warning(
+            "PDF generation failed",
+            extra={"priority": priority, "engine": engine, **timings},
+        )
         return None
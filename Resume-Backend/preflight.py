@@ -0,0 +1,106 @@
+import re
+import unicodedata
+
+from tex_engines import DEFAULT_ENGINE, needs_unicode_engine
+
+# Control sequences escape_latex emits; anything else in a user field is rejected
+ALLOWED_COMMANDS = {"textbackslash", "textasciitilde", "textasciicircum"}
+ALLOWED_ESCAPES = set("&%$#_{}")
+
+# C0/C1 control characters other than tab and newline, which are repaired instead
+_CONTROL_RE = re.compile("[\\x00-\\x08\\x0b-\\x1f\\x7f-\\x9f]")
+_NEWLINES_RE = re.compile(r"\s*[\r\n]+\s*")
+_COMMAND_RE = re.compile(r"\\([A-Za-z]+|.?)", re.DOTALL)
+
+
+class PreflightError(ValueError):
+    """Raised when input is known to make LaTeX fail before any compile runs.
+
+    ``field`` is the path of the offending user field, e.g.
+    ``thoughtworks_experiences[0].descriptions[2]``, or None for problems in
+    the rendered document itself, where ``line`` gives the .tex line number.
+    """
+
+    def __init__(self, message, field=None, line=None):
+        super().__init__(message)
+        self.field = field
+        self.line = line
+
+
+def repair_text(text):
+    """Drop control characters and fold line breaks that would break TeX groups."""
+    text = _CONTROL_RE.sub("", text)
+    text = text.replace("\t", " ")
+    # A blank line is a paragraph break, which is illegal inside \textbf and friends
+    return _NEWLINES_RE.sub(" ", text)
+
+
+def _iter_fields(data, path=""):
+    if isinstance(data, str):
+        yield path, data
+    elif isinstance(data, list):
+        for index, item in enumerate(data):
+            yield from _iter_fields(item, f"{path}[{index}]")
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            yield from _iter_fields(value, f"{path}.{key}" if path else str(key))
+
+
+def _check_field(path, text, engine):
+    for match in _COMMAND_RE.finditer(text):
+        name = match.group(1)
+        if name.isalpha():
+            if name not in ALLOWED_COMMANDS:
+                raise PreflightError(f"Unexpected LaTeX command \\{name}", field=path)
+        elif name not in ALLOWED_ESCAPES:
+            raise PreflightError("Unescaped backslash", field=path)
+
+    # Braces outside escapes may only come from the {} after \textasciitilde etc.
+    depth = 0
+    for char in _COMMAND_RE.sub("", text):
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth < 0:
+                break
+    if depth != 0:
+        raise PreflightError("Unbalanced braces", field=path)
+
+    for char in text:
+        category = unicodedata.category(char)
+        if category in ("Cs", "Co", "Cn"):
+            raise PreflightError(f"Unsupported character U+{ord(char):04X}", field=path)
+
+    if engine == DEFAULT_ENGINE and needs_unicode_engine(text):
+        char = next(c for c in text if needs_unicode_engine(c))
+        raise PreflightError(
+            f"Character U+{ord(char):04X} cannot be typeset", field=path
+        )
+
+
+def check_fields(data, engine=DEFAULT_ENGINE, prefix=""):
+    """Validate every sanitized user field for the engine that will compile it."""
+    for path, text in _iter_fields(data, prefix):
+        _check_field(path, text, engine)
+
+
+def check_tex_body(tex):
+    """Check the rendered document for unbalanced braces, skipping comments."""
+    depth = 0
+    opened = []
+    for number, line in enumerate(tex.splitlines(), start=1):
+        # Strip comments, but not escaped percent signs
+        line = re.sub(r"(?<!\\)%.*", "", line)
+        line = re.sub(r"\\[{}\\%]", "", line)
+        for char in line:
+            if char == "{":
+                depth += 1
+                opened.append(number)
+            elif char == "}":
+                depth -= 1
+                if depth < 0:
+                    raise PreflightError("Unmatched closing brace", line=number)
+                opened.pop()
+    if depth != 0:
+        raise PreflightError("Unclosed brace", line=opened[-1])
@@ -0,0 +1,146 @@
+import logging
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from pdf_generation import generate_resume_pdf
+from resource_monitor import TEMP_PREFIX
+from result_cache import cache_key
+from tracing import SPAN_KIND_CONSUMER, current_span, tracer
+
+logger = logging.getLogger("resume.prerender")
+
+
+class Prerenderer:
+    """Renders resume drafts in the background into the result cache.
+
+    Only the newest draft of each session is kept: submitting a new draft
+    cancels the previous one if it has not started compiling yet, and so
+    does evicting the session. At most ``max_pending`` drafts are queued or
+    rendering; further drafts are dropped.
+    """
+
+    def __init__(
+        self,
+        cache,
+        max_workers=2,
+        max_sessions=1000,
+        max_pending=32,
+        reproducible=False,
+    ):
+        self.cache = cache
+        self.reproducible = reproducible
+        self.max_sessions = max_sessions
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="prerender"
+        )
+        self._sessions = OrderedDict()
+        self._in_flight = {}
+        self._submitted = 0
+        self._superseded = 0
+        self._dropped = 0
+        self._taken_over = 0
+        self._lock = threading.Lock()
+
+    def submit(self, session_id, data):
+        """Schedule a render of ``data`` for ``session_id``.
+
+        Returns "cached" if the PDF is already available, "pending" if the same
+        draft is already being rendered, "dropped" if the backlog is full, and
+        "scheduled" otherwise.
+        """
+        key = cache_key(data)
+        if key in self.cache:
+            return "cached"
+
+        with self._lock:
+            previous = self._sessions.pop(session_id, None)
+            self._sessions[session_id] = key
+            while len(self._sessions) > self.max_sessions:
+                _, evicted = self._sessions.popitem(last=False)
+                self._cancel(evicted)
+
+            if previous is not None and previous != key:
+                self._cancel(previous)
+            if key in self._in_flight:
+                return "pending"
+            if len(self._in_flight) >= self.max_pending:
+                self._dropped += 1
+                return "dropped"
+
+            # Carry the trace across the hop to the worker thread
+            self._in_flight[key] = self._executor.submit(
+                self._render, key, data, current_span.get(), time.monotonic()
+            )
+            self._submitted += 1
+            return "scheduled"
+
+    def _cancel(self, key):
+        # Drafts still shared with another session keep rendering
+        if key in self._sessions.values():
+            return
+        future = self._in_flight.get(key)
+        if future is not None and future.cancel():
+            del self._in_flight[key]
+            self._superseded += 1
+
+    def _render(self, key, data, parent=None, submitted=None):
+        with tracer.span("prerender", parent=parent, kind=SPAN_KIND_CONSUMER) as span:
+            if submitted is not None:
+                span.set_attribute(
+                    "queue_seconds", round(time.monotonic() - submitted, 4)
+                )
+            temp_dir = tempfile.mkdtemp(prefix=TEMP_PREFIX)
+            try:
+                pdf_path = generate_resume_pdf(
+                    temp_dir, data, priority="preview", reproducible=self.reproducible
+                )
+                if not pdf_path:
+                    return None
+                with tracer.span("read-back"):
+                    with open(pdf_path, "rb") as f:
+                        content = f.read()
+                self.cache.put(key, content)
+                return content
+            except Exception:
+                logger.exception("Prerender failed")
+                return None
+            finally:
+                with tracer.span("cleanup"):
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+                with self._lock:
+                    self._in_flight.pop(key, None)
+
+    def wait_for(self, key, timeout):
+        """Wait for a running render of ``key``; returns the PDF bytes or None.
+
+        A draft that is still queued is cancelled instead, so the caller
+        compiles it at its own priority rather than waiting for the backlog.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None and future.cancel():
+                del self._in_flight[key]
+                self._taken_over += 1
+                return None
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "in_flight": len(self._in_flight),
+                "submitted": self._submitted,
+                "superseded": self._superseded,
+                "dropped": self._dropped,
+                "taken_over": self._taken_over,
+            }
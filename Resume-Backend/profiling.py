@@ -0,0 +1,218 @@
+import cProfile
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+
+logger = logging.getLogger("resume.profiling")
+
+# Artifacts written for every profiled request
+ARTIFACTS = {
+    "pstats": "profile.pstats",
+    "collapsed": "stacks.collapsed",
+    "summary": "summary.json",
+    "pdflatex-log": "pdflatex.log",
+}
+
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+
+# Profiles are stored under server-generated ids, never client-supplied ones
+_PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# Cap on how much of the pdflatex log is kept per request
+MAX_LOG_BYTES = 1024 * 1024
+
+
+def valid_request_id(request_id):
+    return bool(request_id) and bool(_REQUEST_ID_RE.match(request_id))
+
+
+class _StackSampler(threading.Thread):
+    """Samples the stack of one thread at a fixed interval into collapsed stacks."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class RequestProfile:
+    """Profile of a single request: cProfile data, stack samples and TeX timings."""
+
+    def __init__(self, request_id, sample_interval):
+        self.profile_id = uuid.uuid4().hex
+        self.request_id = request_id
+        self.started = time.time()
+        self.compiles = []
+        self.pdflatex_log = None
+        self._profile = cProfile.Profile()
+        self._sampler = _StackSampler(threading.get_ident(), sample_interval)
+
+    def start(self):
+        self._sampler.start()
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+        self._sampler.stop()
+
+    def record_compile(self, command, returncode, duration, log_path):
+        self.compiles.append(
+            {"command": command, "returncode": returncode, "seconds": duration}
+        )
+        if os.path.exists(log_path):
+            with open(log_path, "rb") as f:
+                self.pdflatex_log = f.read(MAX_LOG_BYTES)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self._profile.dump_stats(os.path.join(directory, ARTIFACTS["pstats"]))
+
+        with open(os.path.join(directory, ARTIFACTS["collapsed"]), "w") as f:
+            for stack, count in self._sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        if self.pdflatex_log is not None:
+            with open(os.path.join(directory, ARTIFACTS["pdflatex-log"]), "wb") as f:
+                f.write(self.pdflatex_log)
+
+        summary = {
+            "profile_id": self.profile_id,
+            "request_id": self.request_id,
+            "started": self.started,
+            "seconds": time.time() - self.started,
+            "compiles": self.compiles,
+        }
+        with open(os.path.join(directory, ARTIFACTS["summary"]), "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+class Profiler:
+    """Opt-in per-request profiling, triggered by token header or sampling.
+
+    When neither a token nor a sample rate is configured, ``enabled`` is False
+    and every hook returns immediately.
+    """
+
+    def __init__(
+        self,
+        output_dir,
+        token=None,
+        sample_rate=0.0,
+        sample_interval=0.005,
+        max_profiles=100,
+    ):
+        self.output_dir = output_dir
+        self.token = token
+        self.sample_rate = sample_rate
+        self.sample_interval = sample_interval
+        self.max_profiles = max_profiles
+        self._local = threading.local()
+
+    @property
+    def enabled(self):
+        return bool(self.token) or self.sample_rate > 0
+
+    def authorized(self, token):
+        return (
+            bool(self.token) and bool(token) and hmac.compare_digest(token, self.token)
+        )
+
+    def should_profile(self, token):
+        if self.authorized(token):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self, request_id):
+        profile = RequestProfile(request_id, self.sample_interval)
+        self._local.profile = profile
+        profile.start()
+        return profile
+
+    def current(self):
+        return getattr(self._local, "profile", None)
+
+    def finish(self):
+        """Stop the active profile on this thread and persist its artifacts."""
+        profile = self.current()
+        if profile is None:
+            return None
+        self._local.profile = None
+        profile.stop()
+        # Never fail the request being observed because its profile was not saved
+        try:
+            profile.save(self.artifact_dir(profile.profile_id))
+            self._prune()
+        except OSError as e:
+            logger.warning(
+                "Could not save request profile",
+                extra={"profile_id": profile.profile_id, "error": str(e)},
+            )
+        return profile
+
+    def record_compile(self, command, returncode, duration, log_path):
+        profile = self.current()
+        if profile is not None:
+            profile.record_compile(command, returncode, duration, log_path)
+
+    def artifact_dir(self, profile_id):
+        return os.path.join(self.output_dir, profile_id)
+
+    def artifact_path(self, profile_id, artifact):
+        if not _PROFILE_ID_RE.match(profile_id or "") or artifact not in ARTIFACTS:
+            return None
+        path = os.path.join(self.artifact_dir(profile_id), ARTIFACTS[artifact])
+        return path if os.path.exists(path) else None
+
+    def _prune(self):
+        # Every worker prunes the same directory, so entries can vanish mid-scan
+        entries = []
+        for name in os.listdir(self.output_dir):
+            path = os.path.join(self.output_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                continue
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_profiles :]:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+# Shared profiler, configured from the environment
+profiler = Profiler(
+    output_dir=os.environ.get(
+        "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "resume-profiles")
+    ),
+    token=os.environ.get("PROFILE_TOKEN"),
+    sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", 0)),
+    max_profiles=int(os.environ.get("PROFILE_MAX_PROFILES", 100)),
+)
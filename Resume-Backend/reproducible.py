@@ -0,0 +1,68 @@
+import hashlib
+import os
+import re
+import time
+
+# Fixed timestamp embedded in reproducible PDFs unless SOURCE_DATE_EPOCH is set
+DEFAULT_EPOCH = 1704067200  # 2024-01-01T00:00:00Z
+
+_DATE_RE = re.compile(rb"/(CreationDate|ModDate)(\s*)\(D:[^)]*\)")
+_ID_RE = re.compile(rb"/ID(\s*)\[(\s*)<([0-9A-Fa-f]+)>(\s*)<([0-9A-Fa-f]+)>(\s*)\]")
+
+
+def source_date_epoch():
+    return int(os.environ.get("SOURCE_DATE_EPOCH", DEFAULT_EPOCH))
+
+
+def reproducible_env():
+    """Environment for TeX that pins \\today, PDF dates and the ID seed."""
+    return {
+        **os.environ,
+        "SOURCE_DATE_EPOCH": str(source_date_epoch()),
+        "FORCE_SOURCE_DATE": "1",
+    }
+
+
+def content_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest().upper()
+
+
+def _pdf_date(epoch):
+    return time.strftime("D:%Y%m%d%H%M%SZ", time.gmtime(epoch)).encode()
+
+
+def _same_length(original, replacement):
+    # Keep every byte offset in the xref table valid by padding with whitespace
+    if len(replacement) > len(original):
+        return original
+    return replacement + b" " * (len(original) - len(replacement))
+
+
+def normalize_pdf(content, digest, epoch=None):
+    """Rewrite dates and the trailer /ID so identical input yields identical bytes.
+
+    The trailer /ID otherwise depends on the output path, which differs per
+    temporary directory. Replacements keep their original length, so the
+    cross-reference offsets stay correct.
+    """
+    date = _pdf_date(source_date_epoch() if epoch is None else epoch)
+
+    def replace_date(match):
+        replacement = b"/%s%s(%s)" % (match.group(1), match.group(2), date)
+        return _same_length(match.group(0), replacement)
+
+    def replace_id(match):
+        first, second = match.group(3), match.group(5)
+        seed = (digest * (len(first) // len(digest) + 1)).encode("ascii")
+        replacement = b"/ID%s[%s<%s>%s<%s>%s]" % (
+            match.group(1),
+            match.group(2),
+            seed[: len(first)],
+            match.group(4),
+            seed[: len(second)],
+            match.group(6),
+        )
+        return _same_length(match.group(0), replacement)
+
+    content = _DATE_RE.sub(replace_date, content)
+    return _ID_RE.sub(replace_id, content)
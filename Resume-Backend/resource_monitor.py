@@ -0,0 +1,90 @@
+import os
+import tempfile
+import threading
+
+from serving_config import current_rss
+
+# Prefix of every temporary directory the service creates
+TEMP_PREFIX = "resume-pdf-"
+
+# Growth over a run above which a counter is reported as leaking
+DEFAULT_TOLERANCES = {
+    "open_fds": 4,
+    "child_processes": 1,
+    "zombies": 1,
+    "temp_dirs": 1,
+    "threads": 2,
+    "rss_bytes": 32 * 1024 * 1024,
+}
+
+
+def _children():
+    """(pid, state) of the direct children of this process, from /proc."""
+    children = []
+    own_pid = os.getpid()
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces, so split after its closing parenthesis
+        fields = stat.rsplit(")", 1)[1].split()
+        if int(fields[1]) == own_pid:
+            children.append((int(entry), fields[0]))
+    return children
+
+
+def sample_resources():
+    """Snapshot of the counters that grow when requests leak resources."""
+    sample = {
+        "open_fds": None,
+        "child_processes": None,
+        "zombies": None,
+        "temp_dirs": sum(
+            1
+            for name in os.listdir(tempfile.gettempdir())
+            if name.startswith(TEMP_PREFIX)
+        ),
+        "threads": threading.active_count(),
+        "rss_bytes": current_rss(),
+    }
+    if os.path.isdir("/proc/self/fd"):
+        sample["open_fds"] = len(os.listdir("/proc/self/fd"))
+        children = _children()
+        sample["child_processes"] = len(children)
+        sample["zombies"] = sum(1 for _, state in children if state == "Z")
+    return sample
+
+
+def growth(values):
+    """Least-squares slope of ``values`` multiplied out over the whole run."""
+    count = len(values)
+    if count < 2:
+        return 0.0
+    mean_x = (count - 1) / 2
+    mean_y = sum(values) / count
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    variance = sum((x - mean_x) ** 2 for x in range(count))
+    return covariance / variance * (count - 1)
+
+
+def find_leaks(samples, tolerances=None, warmup=0.2):
+    """Return ``{counter: growth}`` for counters trending upward across ``samples``.
+
+    The first ``warmup`` fraction of samples is ignored so caches, thread
+    pools and lazily imported modules can settle first.
+    """
+    tolerances = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    steady = samples[int(len(samples) * warmup) :]
+    leaks = {}
+    for counter, tolerance in tolerances.items():
+        values = [
+            sample[counter] for sample in steady if sample.get(counter) is not None
+        ]
+        trend = growth(values)
+        if trend > tolerance:
+            leaks[counter] = trend
+    return leaks
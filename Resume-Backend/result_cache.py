@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Everything a render reads besides the data: templates, includes and images
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# (file stats, digest) of the last fingerprinted template directory
+_fingerprint = (None, None)
+
+
+def template_fingerprint(template_dir=None):
+    """Hash of every file in the template directory, recomputed when one changes."""
+    global _fingerprint
+
+    template_dir = template_dir or TEMPLATE_DIR
+    stats = sorted(
+        (entry.path, entry.stat().st_mtime_ns, entry.stat().st_size)
+        for entry in os.scandir(template_dir)
+        if entry.is_file()
+    )
+    cached_stats, digest = _fingerprint
+    if stats == cached_stats:
+        return digest
+
+    hasher = hashlib.sha256()
+    for path, _, _ in stats:
+        hasher.update(os.path.basename(path).encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            hasher.update(hashlib.sha256(f.read()).digest())
+    digest = hasher.hexdigest()
+    _fingerprint = (stats, digest)
+    return digest
+
+
+def cache_key(data, template_name="twks_resume_template.tex", **options):
+    """Content hash identifying the PDF rendered from ``data`` and ``options``.
+
+    The TeX backend and the template files are part of the key, so output
+    of the fake engine or of an older template is never served.
+    """
+    canonical = json.dumps(
+        {
+            "template": template_name,
+            "templates": template_fingerprint(),
+            "backend": os.environ.get("TEX_BACKEND", "tex"),
+            "data": data,
+            "options": options,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Size-bounded LRU cache of rendered PDFs keyed by content hash.
+
+    Entries expire after ``ttl`` seconds, so speculative renders that are
+    never downloaded age out without any explicit cleanup. With a ``shared``
+    artifact store, entries are written through to it and local misses are
+    looked up there, so work done by other processes is reused.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=900, shared=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.shared = shared
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._shared_hits = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        if self.shared is None:
+            return None
+        content = self.shared.get(key)
+        if content is not None:
+            self._store(key, content)
+            with self._lock:
+                self._shared_hits += 1
+        return content
+
+    def put(self, key, content):
+        self._store(key, content)
+        if self.shared is not None:
+            self.shared.put(key, content)
+
+    def _store(self, key, content):
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (content, time.monotonic())
+            self._bytes += len(content)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] <= self.ttl:
+                return True
+        return self.shared is not None and key in self.shared
+
+    def _remove(self, key):
+        content, _ = self._entries.pop(key)
+        self._bytes -= len(content)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "shared_hits": self._shared_hits,
+                "shared": self.shared.stats() if self.shared is not None else None,
+            }
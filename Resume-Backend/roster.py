@@ -0,0 +1,130 @@
+import logging
+import os
+import re
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader
+from pypdf import PdfReader, PdfWriter
+
+from pdf_generation import compile_latex_to_pdf, sanitize_data, template_bytecode_cache
+from preflight import check_fields, check_tex_body
+from tex_engines import engine_registry
+from tracing import tracer
+
+logger = logging.getLogger("resume.roster")
+
+_ROSTER_PAGES_RE = re.compile(r"^ROSTER-PAGES:(\d+):(\d+)$", re.MULTILINE)
+
+# A roster is one TeX run over every resume, far longer than a single compile
+ROSTER_COMPILE_TIMEOUT = float(os.environ.get("ROSTER_COMPILE_TIMEOUT", 900))
+
+
+def parse_page_ranges(log_text, count):
+    """Turn the per-resume page counts written to the log into 1-based page ranges."""
+    pages = {
+        int(index): int(total) for index, total in _ROSTER_PAGES_RE.findall(log_text)
+    }
+    if sorted(pages) != list(range(1, count + 1)):
+        return None
+
+    ranges = []
+    start = 1
+    for index in range(1, count + 1):
+        ranges.append((start, start + pages[index] - 1))
+        start += pages[index]
+    return ranges
+
+
+def generate_roster_pdf(
+    output_dir,
+    resumes,
+    split=False,
+    template_name="twks_roster_template.tex",
+    priority="bulk",
+):
+    """Render many resumes into one PDF with a single LaTeX compile.
+
+    Each resume starts on a new page with its own page numbering and a PDF
+    bookmark. Returns a dict with the combined ``pdf_path``, the ``page_ranges``
+    of each resume and, when ``split`` is set, the per-resume ``split_paths``.
+    Returns None if compilation fails.
+    """
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    env = Environment(
+        loader=FileSystemLoader(os.path.join(current_dir, "templates")),
+        autoescape=False,
+        bytecode_cache=template_bytecode_cache,
+    )
+    template = env.get_template(template_name)
+
+    sanitized = [sanitize_data(resume) for resume in resumes]
+    engine = engine_registry.select(sanitized)
+    check_fields(sanitized, engine, prefix="resumes")
+    filled_tex = template.render(resumes=sanitized)
+    check_tex_body(filled_tex)
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    tex_path = os.path.join(output_dir, "roster.tex")
+    pdf_path = os.path.join(output_dir, "roster.pdf")
+    with open(tex_path, "w", encoding="utf-8") as f:
+        f.write(filled_tex)
+
+    if not compile_latex_to_pdf(
+        tex_path,
+        output_dir,
+        priority=priority,
+        engine=engine,
+        timeout=ROSTER_COMPILE_TIMEOUT,
+    ):
+        logger.warning("Roster generation failed", extra={"resumes": len(resumes)})
+        return None
+
+    with open(
+        os.path.join(output_dir, "roster.log"), encoding="utf-8", errors="replace"
+    ) as f:
+        page_ranges = parse_page_ranges(f.read(), len(resumes))
+
+    result = {"pdf_path": pdf_path, "page_ranges": page_ranges}
+    if split:
+        if page_ranges is None:
+            logger.warning("Roster page ranges missing from log, cannot split")
+            return None
+        result["split_paths"] = split_roster_pdf(pdf_path, page_ranges, output_dir)
+        if result["split_paths"] is None:
+            return None
+
+    logger.info(
+        "Roster generated",
+        extra={"resumes": len(resumes), "engine": engine, "split": split},
+    )
+    return result
+
+
+def split_roster_pdf(pdf_path, page_ranges, output_dir):
+    """Copy each page range of the combined PDF into its own file.
+
+    Pages are copied in-process, without starting a TeX run per person.
+    Returns the list of paths, or None if the ranges do not match the PDF.
+    """
+    split_dir = os.path.join(output_dir, "split")
+    Path(split_dir).mkdir(parents=True, exist_ok=True)
+
+    with tracer.span("split", resumes=len(page_ranges)):
+        reader = PdfReader(pdf_path)
+        if page_ranges[-1][1] > len(reader.pages):
+            logger.warning(
+                "Roster page ranges exceed the PDF",
+                extra={"pages": len(reader.pages), "expected": page_ranges[-1][1]},
+            )
+            return None
+
+        paths = []
+        for index, (first, last) in enumerate(page_ranges):
+            writer = PdfWriter()
+            for page in reader.pages[first - 1 : last]:
+                writer.add_page(page)
+            path = os.path.join(split_dir, f"resume-{index + 1}.pdf")
+            with open(path, "wb") as f:
+                writer.write(f)
+            paths.append(path)
+        return paths
@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Priority classes, from most to least latency sensitive
+PRIORITIES = ("interactive", "preview", "bulk")
+
+DEFAULT_WEIGHTS = {"interactive": 8, "preview": 3, "bulk": 1}
+
+
+class _Waiter:
+    def __init__(self, priority):
+        self.priority = priority
+        self.enqueued = time.monotonic()
+        self.event = threading.Event()
+
+
+class _ClassStats:
+    def __init__(self, window=200):
+        self.running = 0
+        self.completed = 0
+        self.waits = deque(maxlen=window)
+
+    def snapshot(self, depth):
+        waits = sorted(self.waits)
+        p95 = waits[int(0.95 * (len(waits) - 1))] if waits else None
+        return {
+            "queue_depth": depth,
+            "running": self.running,
+            "completed": self.completed,
+            "wait_p95": p95,
+            "wait_max": waits[-1] if waits else None,
+        }
+
+
+class CompileScheduler:
+    """Weighted fair scheduler for a fixed number of compile slots.
+
+    Each priority class accrues virtual time at ``1 / weight`` per dispatched
+    job and the backlogged class with the smallest virtual time goes next, so
+    with the default weights interactive work gets eight slots for every one
+    given to bulk work while the queue is contended. Any job that has waited
+    longer than ``max_wait`` seconds jumps the line so no class starves.
+
+    Running compiles are never pre-empted, so ``reserved`` extra slots are
+    kept that only interactive jobs may take: a long bulk compile can hold
+    a regular slot without a download queuing behind it.
+    """
+
+    def __init__(self, slots, weights=None, max_wait=30.0, reserved=0):
+        self.slots = max(1, slots)
+        self.reserved = max(0, reserved)
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.max_wait = max_wait
+
+        self._free = self.slots + self.reserved
+        self._queues = {priority: deque() for priority in self.weights}
+        self._vtime = {priority: 0.0 for priority in self.weights}
+        self._stats = {priority: _ClassStats() for priority in self.weights}
+        self._lock = threading.Lock()
+
+    def acquire(self, priority="interactive"):
+        """Block until a compile slot is granted to this ``priority`` class."""
+        if priority not in self.weights:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        waiter = _Waiter(priority)
+        with self._lock:
+            if not self._queues[priority]:
+                # Do not let a class that sat idle bank credit from the past
+                active = [self._vtime[p] for p, q in self._queues.items() if q]
+                floor = min(active) if active else max(self._vtime.values())
+                self._vtime[priority] = max(self._vtime[priority], floor)
+            self._queues[priority].append(waiter)
+            self._dispatch()
+        waiter.event.wait()
+
+    def release(self, priority="interactive"):
+        with self._lock:
+            self._free += 1
+            stats = self._stats[priority]
+            stats.running -= 1
+            stats.completed += 1
+            self._dispatch()
+
+    def _dispatch(self):
+        while self._free > 0:
+            priority = self._next_class()
+            if priority is None:
+                return
+            waiter = self._queues[priority].popleft()
+            self._vtime[priority] += 1.0 / self.weights[priority]
+            self._free -= 1
+
+            stats = self._stats[priority]
+            stats.running += 1
+            stats.waits.append(time.monotonic() - waiter.enqueued)
+            waiter.event.set()
+
+    def _next_class(self):
+        backlogged = [p for p, q in self._queues.items() if q]
+        if self._free <= self.reserved:
+            backlogged = [p for p in backlogged if p == "interactive"]
+        if not backlogged:
+            return None
+
+        # Starvation protection: serve the oldest overdue job first
+        now = time.monotonic()
+        overdue = [
+            p for p in backlogged if now - self._queues[p][0].enqueued > self.max_wait
+        ]
+        if overdue:
+            return min(overdue, key=lambda p: self._queues[p][0].enqueued)
+
+        return min(backlogged, key=lambda p: (self._vtime[p], -self.weights[p]))
+
+    @contextmanager
+    def slot(self, priority="interactive"):
+        self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "slots": self.slots,
+                "reserved": self.reserved,
+                "free": self._free,
+                "classes": {
+                    priority: self._stats[priority].snapshot(
+                        len(self._queues[priority])
+                    )
+                    for priority in self.weights
+                },
+            }
+
+
+# Shared scheduler used by the compile path
+compile_scheduler = CompileScheduler(
+    slots=int(os.environ.get("COMPILE_SLOTS", os.cpu_count() or 1)),
+    max_wait=float(os.environ.get("COMPILE_MAX_WAIT", 30)),
+    reserved=int(os.environ.get("COMPILE_RESERVED_SLOTS", 1)),
+)
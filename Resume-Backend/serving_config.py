@@ -0,0 +1,169 @@
+import math
+import os
+import tempfile
+import time
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# Rough memory footprints used for sizing, in MiB
+WORKER_BASE_MB = 150
+COMPILE_MB = 120
+
+DEFAULT_COMPILE_LATENCY = 5.0
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def read_cpu_limit(root=CGROUP_ROOT):
+    """Return the CPU quota of this container in cores, falling back to the host count."""
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    cpu_max = _read(os.path.join(root, "cpu.max"))
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+
+    # cgroup v1
+    quota = _read(os.path.join(root, "cpu", "cpu.cfs_quota_us"))
+    period = _read(os.path.join(root, "cpu", "cpu.cfs_period_us"))
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+
+    if hasattr(os, "sched_getaffinity"):
+        return float(len(os.sched_getaffinity(0)))
+    return float(os.cpu_count() or 1)
+
+
+def read_memory_limit(root=CGROUP_ROOT):
+    """Return the memory limit of this container in bytes, or None if unlimited."""
+    limit = _read(os.path.join(root, "memory.max"))
+    if limit and limit != "max":
+        return int(limit)
+
+    limit = _read(os.path.join(root, "memory", "memory.limit_in_bytes"))
+    # cgroup v1 reports "unlimited" as a huge page-aligned number
+    if limit and int(limit) < 2**60:
+        return int(limit)
+    return None
+
+
+def current_rss():
+    """Resident set size of this process in bytes."""
+    statm = _read("/proc/self/statm")
+    if statm:
+        return int(statm.split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    import resource
+
+    # ru_maxrss is the peak, in KiB on Linux; the best available fallback
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure_compile_latency():
+    """Time one real compile of a small resume, also warming fonts and page cache."""
+    from pdf_generation import generate_resume_pdf
+
+    data = {
+        "name": "Warm Up",
+        "role": "Developer",
+        "summary": "Serving configuration warm-up compile.",
+        "thoughtworks_experiences": [],
+        "other_experiences": [],
+        "skills": [{"title": "Languages", "skills": "Python"}],
+    }
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.monotonic()
+        pdf_path = generate_resume_pdf(output_dir, data)
+        latency = time.monotonic() - start
+    return latency if pdf_path else None
+
+
+def compute_serving_config(
+    cpus, memory_bytes=None, compile_latency=DEFAULT_COMPILE_LATENCY, workers=None
+):
+    """Size gunicorn workers and compile concurrency for the given resources.
+
+    pdflatex is CPU bound, so the container runs one compile per core spread
+    across the workers; workers use threads so queued requests do not hold a
+    process each. Memory caps the worker count and sets the RSS watermark at
+    which a worker is recycled.
+    """
+    compile_slots = max(1, int(cpus))
+    available_mb = None
+    if memory_bytes is not None:
+        available_mb = max(
+            WORKER_BASE_MB, memory_bytes // (1024 * 1024) - compile_slots * COMPILE_MB
+        )
+
+    if workers is None:
+        workers = max(1, math.ceil(cpus))
+        if available_mb is not None:
+            workers = max(1, min(workers, available_mb // WORKER_BASE_MB))
+
+    worker_rss_limit = None
+    if available_mb is not None:
+        # Leave headroom below the container limit before the OOM killer steps in
+        worker_rss_limit = int(0.8 * available_mb / workers) * 1024 * 1024
+
+    slots_per_worker = max(1, math.ceil(compile_slots / workers))
+    threads = max(4, slots_per_worker * 4)
+
+    return {
+        "workers": workers,
+        "threads": threads,
+        "compile_slots": slots_per_worker,
+        "compile_max_concurrency": threads,
+        "max_requests": 1000,
+        "max_requests_jitter": 100,
+        "worker_rss_limit": worker_rss_limit,
+        # Long enough for a queued request plus a slow compile, with margin
+        "timeout": max(30, math.ceil(compile_latency * 6)),
+        "graceful_timeout": max(30, math.ceil(compile_latency * 3)),
+        # Longer than the load balancer idle timeout to avoid racing it on close
+        "keepalive": 75,
+    }
+
+
+def load_serving_config():
+    """Build the serving configuration from cgroup limits and the environment.
+
+    Explicit ``GUNICORN_*`` environment variables override the derived values.
+    """
+    cpus = read_cpu_limit()
+    memory_bytes = read_memory_limit()
+    workers = int(os.environ.get("GUNICORN_WORKERS", 0)) or None
+    config = compute_serving_config(cpus, memory_bytes, workers=workers)
+
+    # Compile concurrency must be in the environment before pdf_generation is imported
+    os.environ.setdefault("COMPILE_SLOTS", str(config["compile_slots"]))
+    os.environ.setdefault(
+        "COMPILE_MAX_CONCURRENCY", str(config["compile_max_concurrency"])
+    )
+
+    latency = os.environ.get("COMPILE_LATENCY_SECONDS")
+    if latency:
+        latency = float(latency)
+    else:
+        try:
+            latency = measure_compile_latency()
+        except Exception:
+            latency = None
+
+    if latency:
+        config = compute_serving_config(
+            cpus, memory_bytes, compile_latency=latency, workers=workers
+        )
+    config["cpus"] = cpus
+    config["memory_bytes"] = memory_bytes
+    config["compile_latency"] = latency
+
+    for key in ("threads", "max_requests", "timeout", "keepalive"):
+        env_value = os.environ.get(f"GUNICORN_{key.upper()}")
+        if env_value:
+            config[key] = int(env_value)
+    return config
@@ -0,0 +1,123 @@
+"""Soak test: drive the API with a long mixed workload and fail on resource growth.
+
+Runs thousands of valid, invalid and timing-out requests against the app
+in-process, using the fake TeX engine. After every batch, once nothing is in
+flight, it samples the counters from ``GET /api/self-check`` (open file
+descriptors, child processes, zombies, temporary directories, threads and
+RSS). Exits non-zero if any of them trends upward across the run::
+
+    python soak_test.py --requests 5000 --concurrency 8
+"""
+
+import argparse
+import os
+import random
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Share of requests of each kind; the rest are valid resumes
+INVALID_SHARE = 0.15
+HANG_SHARE = 0.1
+
+
+def configure_environment(compile_timeout):
+    """Settings that must be in place before the app is imported."""
+    os.environ["TEX_BACKEND"] = "fake"
+    os.environ["COMPILE_TIMEOUT"] = str(compile_timeout)
+    # Every payload is unique; a filling cache would look like an RSS leak
+    os.environ["RESULT_CACHE_MB"] = "0"
+    os.environ["ARTIFACT_STORE"] = "none"
+    os.environ.setdefault("FAKE_TEX_FAILURE_RATE", "0.05")
+    os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+
+
+def make_resume(rng, sequence):
+    experiences = [
+        {
+            "title": f"Job {sequence}-{index}",
+            "duration": "2020-2024",
+            "descriptions": [
+                f"Delivered item {n} with 100% coverage & C# tooling"
+                for n in range(rng.randint(1, 4))
+            ],
+            "tech_stack": "Python, Flask",
+        }
+        for index in range(rng.randint(0, 3))
+    ]
+    return {
+        "name": f"Soak Tester {sequence}",
+        "role": "Developer",
+        "summary": "Summary " * rng.randint(1, 50),
+        "thoughtworks_experiences": experiences,
+        "other_experiences": experiences[:1],
+        "skills": [{"title": "Languages", "skills": "Python, Java"}],
+    }
+
+
+def make_request(rng, sequence):
+    """Return ``(kind, kwargs)`` for one ``POST /api/generate-pdf``."""
+    roll = rng.random()
+    if roll < INVALID_SHARE:
+        body = rng.choice(["{}", "not json", '{"name": "\\ud800"}'])
+        return "invalid", {"data": body, "content_type": "application/json"}
+    resume = make_resume(rng, sequence)
+    if roll < INVALID_SHARE + HANG_SHARE:
+        resume["summary"] = "FAKE-TEX-HANG"
+        return "hang", {"json": resume}
+    return "valid", {"json": resume}
+
+
+def run_soak(requests=2000, concurrency=8, batch_size=50, seed=0):
+    """Run the workload; return ``(samples, outcomes)``."""
+    from app import app
+
+    rng = random.Random(seed)
+    outcomes = Counter()
+    samples = []
+
+    def send(kind, kwargs):
+        with app.test_client() as client:
+            response = client.post("/api/generate-pdf", **kwargs)
+            return kind, response.status_code
+
+    with app.test_client() as client, ThreadPoolExecutor(concurrency) as pool:
+        for start in range(0, requests, batch_size):
+            batch = [
+                make_request(rng, sequence)
+                for sequence in range(start, min(start + batch_size, requests))
+            ]
+            for kind, status in pool.map(lambda item: send(*item), batch):
+                outcomes[(kind, status)] += 1
+            samples.append(client.get("/api/self-check").json["resources"])
+    return samples, outcomes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--compile-timeout", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    configure_environment(args.compile_timeout)
+    from resource_monitor import find_leaks
+
+    samples, outcomes = run_soak(
+        args.requests, args.concurrency, args.batch_size, args.seed
+    )
+    for (kind, status), count in sorted(outcomes.items()):
+        print(f"{kind:8} {status}  {count}")
+    print(f"first sample: {samples[0]}")
+    print(f"last sample:  {samples[-1]}")
+
+    leaks = find_leaks(samples)
+    for counter, trend in leaks.items():
+        print(f"LEAK {counter}: grew by {trend:.1f} over the run")
+    return 1 if leaks else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
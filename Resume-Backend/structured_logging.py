@@ -0,0 +1,155 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import time
+
+# Request id of the request being handled on the current thread/context
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message",
+    "asctime",
+    "request_id",
+}
+
+_TEX_LINE_RE = re.compile(r"^l\.(\d+)\s?(.*)$")
+
+MAX_EXCERPT_CHARS = 500
+
+_listener = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current request id to every record."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records for the listener without formatting them first.
+
+    The stock ``prepare`` formats the record and drops ``exc_info``, which
+    would put tracebacks inside ``message``. The queue never leaves the
+    process, so the record can keep its exception for JsonFormatter.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(level=logging.INFO, stream=None):
+    """Route the ``resume`` loggers through a queue to a background writer.
+
+    Request threads only enqueue records; formatting and the write to the
+    container log pipe happen on the listener thread. Safe to call repeatedly.
+    """
+    global _listener
+
+    logger = logging.getLogger("resume")
+    logger.setLevel(level)
+    if _listener is not None:
+        return logger
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    # Resolve the request id on the calling thread, before the record is queued
+    queue_handler.addFilter(RequestIdFilter())
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return logger
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background writer."""
+    global _listener
+
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    logger = logging.getLogger("resume")
+    for handler in list(logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            logger.removeHandler(handler)
+
+
+def restart_logging():
+    """Give a forked worker its own log queue and writer thread.
+
+    Threads do not survive fork, so without this a worker forked after
+    ``configure_logging`` would queue records that are never written.
+    """
+    global _listener
+
+    if _listener is None:
+        return
+    log_queue = queue.SimpleQueue()
+    for handler in logging.getLogger("resume").handlers:
+        if isinstance(handler, logging.handlers.QueueHandler):
+            handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, *_listener.handlers)
+    _listener.start()
+
+
+def parse_tex_error(log_text):
+    """Extract the first TeX error from a pdflatex log.
+
+    Returns a dict with the ``!`` error line, the source line number from the
+    following ``l.<n>`` marker and a short excerpt, or None if no error is found.
+    """
+    if not log_text:
+        return None
+
+    lines = log_text.splitlines()
+    for index, line in enumerate(lines):
+        if not line.startswith("!"):
+            continue
+        error = {"tex_error": line[1:].strip(), "tex_line": None}
+        context = lines[index : index + 8]
+        for follow in context[1:]:
+            match = _TEX_LINE_RE.match(follow)
+            if match:
+                error["tex_line"] = int(match.group(1))
+                break
+        error["tex_excerpt"] = "\n".join(context)[:MAX_EXCERPT_CHARS]
+        return error
+    return None
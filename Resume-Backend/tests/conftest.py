@@ -1,4 +1,6 @@
+import atexit
 import os
+import shutil
 import sys
 import tempfile
 from pathlib import Path
@@ -8,6 +10,11 @@ import pytest
 # Add the parent directory to the path so tests can import app.py
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Keep the shared artifact store of a test run away from any running server
+if "ARTIFACT_DIR" not in os.environ:
+    os.environ["ARTIFACT_DIR"] = tempfile.mkdtemp(prefix="resume-test-artifacts-")
+    atexit.register(shutil.rmtree, os.environ["ARTIFACT_DIR"], ignore_errors=True)
+
 
 @pytest.fixture
 def sample_resume_data():
@@ -52,3 +59,28 @@ def temp_output_dir():
     """Fixture providing a temporary directory for test outputs."""
     with tempfile.TemporaryDirectory() as temp_dir:
         yield temp_dir
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    """Keep rendered PDFs from leaking between tests through the result cache."""
+    from app import result_cache
+
+    result_cache.clear()
+    yield
+    result_cache.clear()
+
+
+@pytest.fixture
+def fake_tex(monkeypatch):
+    """Route every compile through fake_tex.py instead of a real TeX engine."""
+    import pdf_generation
+    import roster
+    from tex_engines import EngineRegistry, configured_engines
+
+    registry = EngineRegistry(configured_engines("fake"))
+    monkeypatch.setattr(pdf_generation, "engine_registry", registry)
+    monkeypatch.setattr(roster, "engine_registry", registry)
+    for name in ("FAKE_TEX_LATENCY", "FAKE_TEX_FAILURE_RATE", "FAKE_TEX_MEMORY_MB"):
+        monkeypatch.delenv(name, raising=False)
+    return registry
@@ -0,0 +1,121 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from admission import AdaptiveLimiter, AdmissionRejected, TokenBucketRateLimiter
+
+
+def test_limiter_admits_up_to_limit():
+    """Test that the limiter admits requests until the limit is reached."""
+    limiter = AdaptiveLimiter(initial_limit=2, queue_timeout=0.05)
+
+    assert limiter.acquire() is True
+    assert limiter.acquire() is True
+    assert limiter.acquire() is False
+
+    stats = limiter.stats()
+    assert stats["in_flight"] == 2
+    assert stats["rejected"] == 1
+
+
+def test_limiter_queued_request_gets_freed_slot():
+    """Test that a waiting request is admitted once a slot is released."""
+    limiter = AdaptiveLimiter(initial_limit=1, queue_timeout=2)
+    limiter.acquire()
+
+    timer = threading.Timer(0.05, limiter.release, args=(0.05,))
+    timer.start()
+    start = time.monotonic()
+    assert limiter.acquire() is True
+    assert time.monotonic() - start < 1
+    timer.join()
+
+
+def test_limiter_max_queue_fails_fast():
+    """Test that requests beyond the queue bound are rejected without waiting."""
+    limiter = AdaptiveLimiter(initial_limit=1, queue_timeout=5, max_queue=0)
+    limiter.acquire()
+
+    start = time.monotonic()
+    assert limiter.acquire() is False
+    assert time.monotonic() - start < 1
+
+
+def test_limiter_grows_when_saturated_and_latency_is_stable():
+    """Test additive increase while latency stays close to the baseline."""
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=10)
+
+    for _ in range(20):
+        limiter.acquire()
+        limiter.acquire()
+        limiter.release(1.0)
+        limiter.release(1.0)
+
+    assert limiter.limit > 2
+
+
+def test_limiter_backs_off_when_latency_climbs():
+    """Test multiplicative decrease once latency exceeds the tolerance."""
+    limiter = AdaptiveLimiter(initial_limit=8, min_limit=1)
+
+    limiter.acquire()
+    limiter.release(1.0)
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release(10.0)
+
+    assert limiter.limit < 8
+    assert limiter.limit >= 1
+
+
+def test_limiter_failures_do_not_move_the_limit():
+    """Test that failed compiles do not feed the latency controller."""
+    limiter = AdaptiveLimiter(initial_limit=4)
+    limiter.acquire()
+    limiter.release(100.0, success=False)
+
+    assert limiter.limit == 4
+    assert limiter.stats()["latency_ewma"] is None
+
+
+def test_limiter_slot_raises_with_retry_after():
+    """Test that the slot context manager raises when the queue deadline expires."""
+    limiter = AdaptiveLimiter(initial_limit=1, queue_timeout=0.01)
+    limiter.acquire()
+    limiter.release(3.2)
+    limiter.acquire()
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        with limiter.slot():
+            pass
+    assert exc_info.value.retry_after == 4
+
+
+def test_token_bucket_limits_per_client():
+    """Test that each client gets its own burst allowance."""
+    limiter = TokenBucketRateLimiter(rate=0.1, burst=2)
+
+    assert limiter.allow("a") == (True, 0)
+    assert limiter.allow("a") == (True, 0)
+    allowed, retry_after = limiter.allow("a")
+    assert allowed is False
+    assert retry_after >= 1
+
+    # Another client is unaffected
+    assert limiter.allow("b") == (True, 0)
+
+
+def test_token_bucket_prunes_idle_clients():
+    """Test that refilled buckets are dropped once the client table is full."""
+    limiter = TokenBucketRateLimiter(rate=1000, burst=1, max_clients=2)
+    for client in ("a", "b", "c"):
+        limiter.allow(client)
+    time.sleep(0.01)
+    limiter.allow("d")
+
+    assert len(limiter._buckets) <= 2
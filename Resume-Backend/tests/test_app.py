@@ -182,8 +182,7 @@ def test_sanitize_data():
     assert "\\{" in sanitized["text_with_specials"]
     assert "\\}" in sanitized["text_with_specials"]
 
-    # The actual implementation replaces C# with C\# first, then escapes the backslash
-    # so it becomes C\\\\# - we only need to check that C# is there with some escaping
+    # C# is escaped like any other "#"
     assert "C" in sanitized["nested"]["csharp"]
     assert "#" in sanitized["nested"]["csharp"]
     assert "code" in sanitized["list_data"][1]
@@ -328,3 +327,56 @@ def test_generate_pdf_large_data(mock_rmtree, mock_generate_pdf, mock_mkdtemp, c
 
     # Note: In a real memory error scenario, cleanup might not occur
     # So we don't assert on mock_rmtree.assert_called_once_with('/tmp/test_dir')
+
+
+@patch("app.generate_resume_pdf")
+def test_generate_pdf_rejected_when_overloaded(mock_generate_pdf, client):
+    """Test that the API sheds load with 503 and Retry-After when no slot frees up."""
+    with patch("app.compile_limiter.acquire", return_value=False):
+        response = client.post("/api/generate-pdf", json={"name": "Test"})
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert "error" in response.json
+    mock_generate_pdf.assert_not_called()
+
+
+@patch("app.generate_resume_pdf")
+def test_generate_pdf_rate_limited(mock_generate_pdf, client):
+    """Test that per-client rate limits return 429 with Retry-After."""
+    from admission import TokenBucketRateLimiter
+
+    mock_generate_pdf.return_value = None
+    with patch("app.rate_limiter", TokenBucketRateLimiter(rate=0.01, burst=1)):
+        first = client.post("/api/generate-pdf", json={"name": "Test"})
+        second = client.post("/api/generate-pdf", json={"name": "Test"})
+
+    assert first.status_code == 500
+    assert second.status_code == 429
+    assert int(second.headers["Retry-After"]) >= 1
+
+
+@patch("app.generate_resume_pdf")
+def test_rate_limit_ignores_spoofed_forwarded_for(mock_generate_pdf, client):
+    """Test that client-supplied X-Forwarded-For entries cannot reset the bucket."""
+    from admission import TokenBucketRateLimiter
+
+    mock_generate_pdf.return_value = None
+    with patch("app.rate_limiter", TokenBucketRateLimiter(rate=0.01, burst=1)):
+        statuses = [
+            client.post(
+                "/api/generate-pdf",
+                json={"name": "Test"},
+                headers={"X-Forwarded-For": f"10.0.0.{index}, 203.0.113.7"},
+            ).status_code
+            for index in range(3)
+        ]
+
+    assert statuses == [500, 429, 429]
+
+
+def test_metrics_route(client):
+    """Test that the metrics route exposes admission control state."""
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert "limit" in response.json["admission"]
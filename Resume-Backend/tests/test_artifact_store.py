@@ -0,0 +1,178 @@
+import hashlib
+import os
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+from jinja2 import DictLoader, Environment
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from artifact_store import SharedDirectoryStore, StoreBytecodeCache, configured_store
+from result_cache import ResultCache
+
+
+def key_for(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A shared directory store under the test's temporary directory."""
+    return SharedDirectoryStore(str(tmp_path / "store"), max_bytes=1000)
+
+
+def test_put_and_get(store):
+    """Test a round trip through the store and its on-disk layout."""
+    key = key_for(b"pdf")
+    store.put(key, b"pdf")
+
+    assert store.get(key) == b"pdf"
+    assert key in store
+    assert os.path.exists(os.path.join(store.root, key[:2], key))
+    assert os.listdir(os.path.join(store.root, "tmp")) == []
+    assert store.get(key_for(b"missing")) is None
+    assert store.stats()["hits"] == 1
+    assert store.stats()["misses"] == 1
+
+
+def test_rejects_non_hash_keys(store):
+    """Test that keys cannot point outside the store directory."""
+    with pytest.raises(ValueError):
+        store.get("../../etc/passwd")
+
+
+def test_shared_between_processes(store):
+    """Test that an artifact written by another process is visible here."""
+    key = key_for(b"from another worker")
+    code = (
+        "import sys; sys.path.insert(0, sys.argv[1]);"
+        "from artifact_store import SharedDirectoryStore;"
+        "SharedDirectoryStore(sys.argv[2]).put(sys.argv[3], b'from another worker')"
+    )
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run(
+        [sys.executable, "-c", code, backend_dir, store.root, key], check=True
+    )
+
+    assert store.get(key) == b"from another worker"
+
+
+def test_sweep_evicts_least_recently_used(store):
+    """Test that going over the size bound removes the oldest-used artifacts first."""
+    keys = [key_for(bytes([index])) for index in range(5)]
+    for age, key in enumerate(keys):
+        store.put(key, b"x" * 90)
+        past = time.time() - 100 + age
+        os.utime(os.path.join(store.root, key[:2], key), (past, past))
+    # Reading the oldest marks it as recently used
+    store.get(keys[0])
+
+    store.put(key_for(b"big"), b"y" * 600)
+
+    assert keys[0] in store
+    assert keys[1] not in store
+    assert key_for(b"big") in store
+    assert store.stats()["evictions"] >= 1
+
+
+def test_sweep_ignores_temp_files_renamed_concurrently(store):
+    """Test that a write finishing while the sweep scans tmp/ does not fail it."""
+
+    class RenamedEntry:
+        path = os.path.join(store.root, "tmp", "tmp-renamed")
+
+        def stat(self):
+            raise FileNotFoundError(self.path)
+
+    real_scandir = os.scandir
+
+    def scandir(path):
+        if path == os.path.join(store.root, "tmp"):
+            return iter([RenamedEntry()])
+        return real_scandir(path)
+
+    key = key_for(b"pdf")
+    with patch("artifact_store.os.scandir", side_effect=scandir):
+        store.put(key, b"x" * 200)
+        store.sweep()
+    assert key in store
+
+
+def test_expired_entries_are_misses(tmp_path):
+    """Test that artifacts unused for longer than the TTL are dropped."""
+    store = SharedDirectoryStore(str(tmp_path), ttl=60)
+    key = key_for(b"old")
+    store.put(key, b"old")
+    path = os.path.join(store.root, key[:2], key)
+    os.utime(path, (time.time() - 120, time.time() - 120))
+
+    assert key not in store
+    assert store.get(key) is None
+    assert not os.path.exists(path)
+
+
+def test_result_cache_reads_through_shared_store(store):
+    """Test that a PDF cached by one worker is served from the store by another."""
+    key = key_for(b"%PDF-shared")
+    ResultCache(shared=store).put(key, b"%PDF-shared")
+    other_worker = ResultCache(shared=store)
+
+    assert key in other_worker
+    assert other_worker.get(key) == b"%PDF-shared"
+    assert other_worker.get(key) == b"%PDF-shared"
+    stats = other_worker.stats()
+    assert stats["shared_hits"] == 1
+    assert stats["hits"] == 1
+
+    other_worker.clear()
+    assert store.get(key) is None
+
+
+def test_bytecode_cache_shares_compiled_templates(tmp_path):
+    """Test that a template compiled by one environment is loaded by the next."""
+    store = SharedDirectoryStore(str(tmp_path))
+    templates = DictLoader({"t.tex": "Hello {{ name }}"})
+    first = Environment(loader=templates, bytecode_cache=StoreBytecodeCache(store))
+    assert first.get_template("t.tex").render(name="A") == "Hello A"
+
+    second = Environment(loader=templates, bytecode_cache=StoreBytecodeCache(store))
+    assert second.get_template("t.tex").render(name="B") == "Hello B"
+    assert store.stats()["hits"] == 1
+
+
+def test_configured_store(monkeypatch, tmp_path):
+    """Test backend selection from ARTIFACT_STORE and ARTIFACT_DIR."""
+    monkeypatch.setenv("ARTIFACT_DIR", str(tmp_path))
+    assert configured_store("pdf", 100).root == str(tmp_path / "pdf")
+    assert configured_store("pdf", 100, backend="none") is None
+    with pytest.raises(ValueError):
+        configured_store("pdf", 100, backend="redis")
+
+
+def test_store_root_is_private(tmp_path):
+    """Test that the store creates its root for the current user only."""
+    store = SharedDirectoryStore(str(tmp_path / "new"), max_bytes=1000)
+    assert os.stat(store.root).st_mode & 0o777 == 0o700
+
+
+def test_store_refuses_shared_writable_root(tmp_path):
+    """Test that a directory others can write to is never used for artifacts."""
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+
+    with pytest.raises(PermissionError):
+        SharedDirectoryStore(str(shared), max_bytes=1000)
+
+
+def test_configured_store_disabled_for_unsafe_dir(monkeypatch, tmp_path):
+    """Test that an unsafe ARTIFACT_DIR disables the store instead of trusting it."""
+    tmp_path.chmod(0o777)
+    monkeypatch.setenv("ARTIFACT_DIR", str(tmp_path))
+    try:
+        assert configured_store("templates", 100) is None
+    finally:
+        tmp_path.chmod(0o700)
@@ -0,0 +1,124 @@
+import io
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fake_tex
+from app import app
+from tex_engines import FAKE_ENGINE_COMMAND, configured_engines
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask app."""
+    with app.test_client() as client:
+        yield client
+
+
+def run_fake_tex(tmp_path, env=None, source="\\documentclass{article}"):
+    tex_file = tmp_path / "doc.tex"
+    tex_file.write_text(source)
+    command = FAKE_ENGINE_COMMAND + ["-output-directory", str(tmp_path), str(tex_file)]
+    return subprocess.run(
+        command, capture_output=True, text=True, env={**os.environ, **(env or {})}
+    )
+
+
+def test_build_pdf_has_valid_xref():
+    """Test that the generated PDF's xref offsets point at its objects."""
+    pdf = fake_tex.build_pdf("Hello (world)")
+    assert pdf.startswith(b"%PDF-1.4")
+
+    startxref = int(pdf.rsplit(b"startxref\n", 1)[1].split(b"\n")[0])
+    assert pdf[startxref:].startswith(b"xref")
+    entries = pdf[startxref:].split(b"\n")[3:8]
+    for number, entry in enumerate(entries, start=1):
+        offset = int(entry.split()[0])
+        assert pdf[offset:].startswith(b"%d 0 obj" % number)
+
+
+def test_fake_tex_writes_pdf_and_log(tmp_path):
+    """Test that the fake engine behaves like pdflatex at the process level."""
+    result = run_fake_tex(tmp_path)
+
+    assert result.returncode == 0
+    assert (tmp_path / "doc.pdf").read_bytes().startswith(b"%PDF")
+    assert "Output written on doc.pdf" in (tmp_path / "doc.log").read_text()
+
+
+def test_fake_tex_failure_rate(tmp_path):
+    """Test that forced failures exit non-zero with a TeX-style error in the log."""
+    result = run_fake_tex(tmp_path, {"FAKE_TEX_FAILURE_RATE": "1"})
+
+    assert result.returncode == 1
+    assert not (tmp_path / "doc.pdf").exists()
+    assert (tmp_path / "doc.log").read_text().splitlines()[2].startswith("! ")
+
+
+def test_fake_tex_latency_and_memory(tmp_path):
+    """Test that configured latency and memory use are honoured."""
+    start = time.monotonic()
+    result = run_fake_tex(
+        tmp_path, {"FAKE_TEX_LATENCY": "0.2-0.3", "FAKE_TEX_MEMORY_MB": "8"}
+    )
+
+    assert result.returncode == 0
+    assert time.monotonic() - start >= 0.2
+
+
+def test_fake_tex_echoes_roster_markers(tmp_path):
+    """Test that roster page markers are written so exports can be split."""
+    source = "\\typeout{ROSTER-PAGES:1:x}\n\\typeout{ROSTER-PAGES:2:x}"
+    run_fake_tex(tmp_path, source=source)
+
+    log = (tmp_path / "doc.log").read_text()
+    assert "ROSTER-PAGES:1:1" in log
+    assert "ROSTER-PAGES:2:1" in log
+
+
+def test_configured_engines():
+    """Test the TEX_BACKEND switch."""
+    assert configured_engines("tex")["pdflatex"][0] == "pdflatex"
+    assert configured_engines("fake")["lualatex"] == FAKE_ENGINE_COMMAND
+    with pytest.raises(ValueError):
+        configured_engines("xetex-cloud")
+
+
+def test_api_end_to_end_with_fake_engine(client, fake_tex, sample_resume_data):
+    """Test the real subprocess, temp dir and response path without TeX."""
+    response = client.post("/api/generate-pdf", json=sample_resume_data)
+
+    assert response.status_code == 200
+    assert response.data.startswith(b"%PDF")
+    assert fake_tex.stats()["pdflatex"]["selected"] == 1
+
+
+def test_api_failure_with_fake_engine(
+    client, fake_tex, sample_resume_data, monkeypatch
+):
+    """Test the failure path with a real failing engine process."""
+    monkeypatch.setenv("FAKE_TEX_FAILURE_RATE", "1")
+    response = client.post("/api/generate-pdf", json=sample_resume_data)
+
+    assert response.status_code == 500
+    assert fake_tex.stats()["pdflatex"]["failures"] == 1
+
+
+def test_api_concurrent_requests_with_fake_engine(client, fake_tex, sample_resume_data):
+    """Test many concurrent requests through the full HTTP and compile path."""
+
+    def post(index):
+        payload = dict(sample_resume_data, summary=f"Summary {index}")
+        with app.test_client() as own_client:
+            return own_client.post("/api/generate-pdf", json=payload).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        statuses = list(executor.map(post, range(24)))
+
+    assert statuses == [200] * 24
@@ -0,0 +1,160 @@
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import app
+from layout_fit import (
+    MIN_FONT_SCALE,
+    MIN_SPACING,
+    PAGE_FILL,
+    fit_layout,
+    measurement_cache,
+    parse_layout_measurement,
+)
+from pdf_generation import generate_resume_pdf
+
+THREE_PAGES = "RESUME-LAYOUT:3:200.0pt:682.0pt:150.0pt"
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask app."""
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def clear_measurements():
+    measurement_cache.clear()
+    yield
+    measurement_cache.clear()
+
+
+def measured_engine(layout_line, sources):
+    """Build a subprocess.run stand-in that logs ``layout_line`` and keeps each source."""
+
+    def run(command, **kwargs):
+        output_dir, tex_file = command[-2], command[-1]
+        with open(tex_file) as f:
+            sources.append(f.read())
+        with open(os.path.join(output_dir, "resume.log"), "w") as f:
+            f.write(f"This is pdfTeX\n{layout_line}\n")
+        with open(os.path.join(output_dir, "resume.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4 test")
+        return MagicMock(returncode=0, stdout="", stderr="")
+
+    return run
+
+
+def height(measurement, layout):
+    """Content height predicted by the model fit_layout solves."""
+    spacing = measurement["spacing_height"]
+    text = measurement["content_height"] - spacing
+    scale = layout["font_scale"]
+    return text * scale**2 + spacing * layout["spacing_scale"] * scale
+
+
+def test_parse_layout_measurement():
+    """Test that the log line becomes the natural content height."""
+    measurement = parse_layout_measurement(f"noise\n{THREE_PAGES}\n")
+    assert measurement == {
+        "pages": 3,
+        "content_height": 2 * 682.0 + 200.0,
+        "text_height": 682.0,
+        "spacing_height": 150.0,
+    }
+    assert parse_layout_measurement("no layout here") is None
+    assert parse_layout_measurement(None) is None
+
+
+def test_fit_layout_not_needed():
+    """Test that a resume already within the page target is left alone."""
+    assert fit_layout(parse_layout_measurement(THREE_PAGES), 3) is None
+
+
+def test_fit_layout_spacing_only():
+    """Test that a small overflow is absorbed by spacing without touching fonts."""
+    measurement = {
+        "pages": 2,
+        "content_height": 660.0,
+        "text_height": 682.0,
+        "spacing_height": 200.0,
+    }
+    layout = fit_layout(measurement, 1)
+    assert layout["font_scale"] == 1.0
+    assert layout["font_sizes"] == []
+    assert MIN_SPACING <= layout["spacing_scale"] < 1
+    assert height(measurement, layout) == pytest.approx(682.0 * PAGE_FILL, rel=0.01)
+
+
+def test_fit_layout_scales_fonts():
+    """Test that larger overflows shrink fonts once spacing is at its minimum."""
+    measurement = parse_layout_measurement(THREE_PAGES)
+    layout = fit_layout(measurement, 2)
+    assert layout["spacing_scale"] == MIN_SPACING
+    assert MIN_FONT_SCALE < layout["font_scale"] < 1
+    assert height(measurement, layout) == pytest.approx(2 * 682.0 * PAGE_FILL, rel=0.01)
+    sizes = {command: (size, skip) for command, size, skip in layout["font_sizes"]}
+    scale = layout["font_scale"]
+    assert sizes["normalsize"] == pytest.approx((10 * scale, 12 * scale), abs=0.01)
+
+
+def test_fit_layout_is_bounded():
+    """Test that hopeless targets stop at the minimum scales instead of shrinking forever."""
+    layout = fit_layout(parse_layout_measurement(THREE_PAGES), 1)
+    assert layout["font_scale"] == MIN_FONT_SCALE
+    assert layout["spacing_scale"] == MIN_SPACING
+
+
+@patch("pdf_generation.subprocess.run")
+def test_generate_measures_then_compiles_once_more(
+    mock_run, sample_resume_data, tmp_path
+):
+    """Test one measuring compile plus one fitted compile, then reuse of the measurement."""
+    sources = []
+    mock_run.side_effect = measured_engine(THREE_PAGES, sources)
+
+    assert generate_resume_pdf(str(tmp_path / "a"), sample_resume_data, max_pages=2)
+    assert mock_run.call_count == 2
+    assert "\\renewcommand{\\resumespacing}" not in sources[0]
+    assert "\\renewcommand{\\resumespacing}{0.4}" in sources[1]
+    assert "\\renewcommand\\normalsize{\\@setfontsize\\normalsize{" in sources[1]
+
+    # A different target for the same content skips the measuring pass
+    assert generate_resume_pdf(str(tmp_path / "b"), sample_resume_data, max_pages=1)
+    assert mock_run.call_count == 3
+    assert "\\renewcommand{\\resumespacing}{0.4}" in sources[2]
+
+
+@patch("pdf_generation.subprocess.run")
+def test_generate_within_target_compiles_once(mock_run, sample_resume_data, tmp_path):
+    """Test that a resume that already fits is compiled exactly once."""
+    sources = []
+    mock_run.side_effect = measured_engine(THREE_PAGES, sources)
+
+    assert generate_resume_pdf(str(tmp_path), sample_resume_data, max_pages=3)
+    assert mock_run.call_count == 1
+
+
+def test_generate_pdf_rejects_bad_max_pages(client, sample_resume_data):
+    """Test that the page target must be a positive integer."""
+    for value in ("0", "two"):
+        response = client.post(
+            f"/api/generate-pdf?max_pages={value}", json=sample_resume_data
+        )
+        assert response.status_code == 400
+
+
+def test_generate_pdf_with_max_pages(client, fake_tex, sample_resume_data):
+    """Test a fitted download end to end, cached separately from the natural layout."""
+    response = client.post("/api/generate-pdf?max_pages=1", json=sample_resume_data)
+    assert response.status_code == 200
+    assert response.data.startswith(b"%PDF")
+    assert fake_tex.stats()["pdflatex"]["selected"] == 1
+
+    client.post("/api/generate-pdf", json=sample_resume_data)
+    assert fake_tex.stats()["pdflatex"]["selected"] == 2
@@ -1,4 +1,5 @@
 import os
+import subprocess
 import sys
 import tempfile
 from pathlib import Path
@@ -81,6 +82,17 @@ def test_compile_latex_to_pdf_failure(mock_run, tmp_path):
     assert result is False
 
 
+@patch("pdf_generation.subprocess.run")
+def test_compile_latex_to_pdf_timeout(mock_run, tmp_path):
+    """Test that a compile exceeding COMPILE_TIMEOUT fails instead of hanging."""
+    mock_run.side_effect = subprocess.TimeoutExpired("pdflatex", 60)
+
+    result = compile_latex_to_pdf("test.tex", str(tmp_path))
+
+    assert result is False
+    assert mock_run.call_args.kwargs["timeout"] > 0
+
+
 @patch("pdf_generation.compile_latex_to_pdf")
 @patch("pdf_generation.Environment")
 def test_generate_resume_pdf_success(mock_env, mock_compile, test_data, tmp_path):
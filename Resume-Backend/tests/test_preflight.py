@@ -0,0 +1,108 @@
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import app
+from pdf_generation import escape_latex, generate_resume_pdf, sanitize_data
+from preflight import PreflightError, check_fields, check_tex_body, repair_text
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask app."""
+    with app.test_client() as client:
+        yield client
+
+
+def test_escape_latex_single_backslash():
+    """Test that a single backslash is escaped rather than passed through to TeX."""
+    assert escape_latex("a\\b") == "a\\textbackslash{}b"
+    assert escape_latex("\\input{/etc/passwd}") == (
+        "\\textbackslash{}input\\{/etc/passwd\\}"
+    )
+
+
+def test_escape_latex_produces_single_escapes():
+    """Test that specials become \\& and friends, not a line break followed by the char."""
+    assert escape_latex("R&D 100% C#") == "R\\&D 100\\% C\\#"
+
+
+def test_repair_text_strips_control_characters():
+    """Test that control characters are removed and line breaks folded."""
+    assert repair_text("a\x00b\x07c\x9b") == "abc"
+    assert repair_text("line one\r\n\r\n  line two\tend") == "line one line two end"
+
+
+def test_check_fields_accepts_sanitized_data(sample_resume_data):
+    """Test that sanitized resume data passes preflight."""
+    sample_resume_data["summary"] = "Tricky: \\ { } ~ ^ & % $ # _ C#"
+    check_fields(sanitize_data(sample_resume_data))
+
+
+def test_check_fields_reports_field_path():
+    """Test that raw control sequences are rejected with the exact field path."""
+    data = {"thoughtworks_experiences": [{"descriptions": ["ok", "\\write18{rm}"]}]}
+    with pytest.raises(PreflightError) as exc_info:
+        check_fields(data)
+    assert exc_info.value.field == "thoughtworks_experiences[0].descriptions[1]"
+    assert "\\write" in str(exc_info.value)
+
+
+def test_check_fields_rejects_unbalanced_braces():
+    """Test that unescaped braces are detected."""
+    with pytest.raises(PreflightError) as exc_info:
+        check_fields({"name": "oops}"})
+    assert exc_info.value.field == "name"
+
+
+def test_check_fields_rejects_unencodable_characters():
+    """Test that characters pdflatex cannot typeset are rejected on the pdflatex path."""
+    with pytest.raises(PreflightError) as exc_info:
+        check_fields({"skills": [{"skills": "日本語"}]}, engine="pdflatex")
+    assert exc_info.value.field == "skills[0].skills"
+    assert "U+65E5" in str(exc_info.value)
+
+    check_fields({"skills": [{"skills": "日本語"}]}, engine="lualatex")
+
+
+def test_check_fields_rejects_private_use_characters():
+    """Test that characters no engine has glyphs for are rejected."""
+    with pytest.raises(PreflightError):
+        check_fields({"name": "\ue000"}, engine="lualatex")
+
+
+def test_check_tex_body():
+    """Test brace balance checks on the rendered document."""
+    check_tex_body("\\textbf{a \\{ b} % comment {\n\\\\{c}")
+
+    with pytest.raises(PreflightError) as exc_info:
+        check_tex_body("ok\n\\textbf{open\n")
+    assert exc_info.value.line == 2
+    assert exc_info.value.field is None
+
+    with pytest.raises(PreflightError):
+        check_tex_body("}")
+
+
+@patch("pdf_generation.subprocess.run")
+def test_generate_skips_tex_for_bad_input(mock_run, sample_resume_data, tmp_path):
+    """Test that no TeX process is started for input known to fail."""
+    sample_resume_data["name"] = "日本語"
+    with patch("tex_engines.EngineRegistry.available", return_value=False):
+        with pytest.raises(PreflightError):
+            generate_resume_pdf(str(tmp_path), sample_resume_data)
+    mock_run.assert_not_called()
+
+
+def test_generate_pdf_route_returns_field_error(client, sample_resume_data):
+    """Test that the API responds with a field-level 400 error."""
+    sample_resume_data["skills"][0]["skills"] = "日本語"
+    with patch("tex_engines.EngineRegistry.available", return_value=False):
+        response = client.post("/api/generate-pdf", json=sample_resume_data)
+
+    assert response.status_code == 400
+    assert response.json["field"] == "skills[0].skills"
@@ -0,0 +1,261 @@
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from admission import TokenBucketRateLimiter
+from app import app
+from app import prerenderer as app_prerenderer
+from app import result_cache
+from prerender import Prerenderer
+from result_cache import ResultCache, cache_key
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask app."""
+    with app.test_client() as client:
+        yield client
+
+
+def fake_generate(content=b"%PDF-prerendered", delay=0.0, calls=None):
+    """Build a generate_resume_pdf stand-in that writes ``content``."""
+
+    def generate(output_dir, data, **kwargs):
+        if calls is not None:
+            calls.append(data)
+        time.sleep(delay)
+        path = os.path.join(output_dir, "resume.pdf")
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    return generate
+
+
+def test_cache_key_is_order_independent():
+    """Test that logically equal payloads share a key and options change it."""
+    assert cache_key({"a": 1, "b": [1, 2]}) == cache_key({"b": [1, 2], "a": 1})
+    assert cache_key({"a": 1}) != cache_key({"a": 2})
+    assert cache_key({"a": 1}) != cache_key({"a": 1}, max_pages=1)
+
+
+def test_cache_key_covers_backend_and_templates(monkeypatch, tmp_path):
+    """Test that the TeX backend and any template file change the key."""
+    key = cache_key({"a": 1})
+    monkeypatch.setenv("TEX_BACKEND", "fake")
+    assert cache_key({"a": 1}) != key
+    monkeypatch.delenv("TEX_BACKEND")
+
+    for name in ("twks_resume_template.tex", "twks_resume_preamble.tex"):
+        (tmp_path / name).write_text("original")
+    monkeypatch.setattr("result_cache.TEMPLATE_DIR", str(tmp_path))
+    before = cache_key({"a": 1})
+    (tmp_path / "twks_resume_preamble.tex").write_text("edited")
+    assert cache_key({"a": 1}) != before
+
+
+def test_result_cache_evicts_least_recently_used():
+    """Test that the cache stays within its byte budget."""
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    cache.get("a")
+    cache.put("c", b"12345")
+
+    assert cache.get("a") == b"12345"
+    assert cache.get("b") is None
+    assert cache.stats()["bytes"] == 10
+
+
+def test_result_cache_expires_entries():
+    """Test that entries older than the TTL are dropped."""
+    cache = ResultCache(ttl=0)
+    cache.put("a", b"x")
+    time.sleep(0.01)
+    assert "a" not in cache
+    assert cache.get("a") is None
+
+
+def test_prerender_fills_cache(sample_resume_data):
+    """Test that a submitted draft is rendered into the cache."""
+    cache = ResultCache()
+    prerenderer = Prerenderer(cache, max_workers=1)
+
+    with patch("prerender.generate_resume_pdf", fake_generate()):
+        assert prerenderer.submit("s1", sample_resume_data) == "scheduled"
+        prerenderer._executor.shutdown(wait=True)
+
+    assert cache.get(cache_key(sample_resume_data)) == b"%PDF-prerendered"
+    assert prerenderer.submit("s1", sample_resume_data) == "cached"
+
+
+def test_prerender_cancels_superseded_drafts(sample_resume_data):
+    """Test that only the newest queued draft of a session is rendered."""
+    cache = ResultCache()
+    prerenderer = Prerenderer(cache, max_workers=1)
+    calls = []
+    blocker = threading.Event()
+
+    def block(*args, **kwargs):
+        blocker.wait(5)
+
+    drafts = [dict(sample_resume_data, summary=f"Draft {i}") for i in range(3)]
+    with patch("prerender.generate_resume_pdf", fake_generate(calls=calls)):
+        # Occupy the only worker so drafts queue up behind it
+        prerenderer._executor.submit(block)
+        for draft in drafts:
+            prerenderer.submit("s1", draft)
+        blocker.set()
+        prerenderer._executor.shutdown(wait=True)
+
+    assert [call["summary"] for call in calls] == ["Draft 2"]
+    assert prerenderer.stats()["superseded"] == 2
+
+
+def test_prerender_drops_drafts_beyond_backlog(sample_resume_data):
+    """Test that drafts are dropped instead of queued once the backlog is full."""
+    prerenderer = Prerenderer(ResultCache(), max_workers=1, max_pending=2)
+    blocker = threading.Event()
+
+    def block(output_dir, data, **kwargs):
+        blocker.wait(5)
+
+    drafts = [dict(sample_resume_data, summary=f"Draft {i}") for i in range(3)]
+    with patch("prerender.generate_resume_pdf", block):
+        statuses = [
+            prerenderer.submit(f"s{i}", draft) for i, draft in enumerate(drafts)
+        ]
+        blocker.set()
+        prerenderer._executor.shutdown(wait=True)
+
+    assert statuses == ["scheduled", "scheduled", "dropped"]
+    assert prerenderer.stats()["dropped"] == 1
+
+
+def test_prerender_cancels_drafts_of_evicted_sessions(sample_resume_data):
+    """Test that evicting a session cancels its queued draft."""
+    prerenderer = Prerenderer(ResultCache(), max_workers=1, max_sessions=1)
+    calls = []
+    blocker = threading.Event()
+
+    drafts = [dict(sample_resume_data, summary=f"Draft {i}") for i in range(2)]
+    with patch("prerender.generate_resume_pdf", fake_generate(calls=calls)):
+        prerenderer._executor.submit(blocker.wait, 5)
+        prerenderer.submit("old", drafts[0])
+        prerenderer.submit("new", drafts[1])
+        assert prerenderer.stats()["in_flight"] == 1
+        blocker.set()
+        prerenderer._executor.shutdown(wait=True)
+
+    assert [call["summary"] for call in calls] == ["Draft 1"]
+    assert prerenderer.stats()["superseded"] == 1
+
+
+def test_wait_for_takes_over_queued_draft(sample_resume_data):
+    """Test that waiting on a draft that has not started cancels it instead."""
+    prerenderer = Prerenderer(ResultCache(), max_workers=1)
+    calls = []
+    blocker = threading.Event()
+
+    with patch("prerender.generate_resume_pdf", fake_generate(calls=calls)):
+        prerenderer._executor.submit(blocker.wait, 5)
+        prerenderer.submit("s1", sample_resume_data)
+
+        started = time.monotonic()
+        assert prerenderer.wait_for(cache_key(sample_resume_data), timeout=5) is None
+        assert time.monotonic() - started < 1
+        blocker.set()
+        prerenderer._executor.shutdown(wait=True)
+
+    assert calls == []
+    assert prerenderer.stats()["in_flight"] == 0
+    assert prerenderer.stats()["taken_over"] == 1
+
+
+@patch("app.generate_resume_pdf")
+def test_download_compiles_draft_still_queued(
+    mock_generate_pdf, client, sample_resume_data
+):
+    """Test that a download does not wait behind the prerender backlog."""
+    mock_generate_pdf.side_effect = fake_generate(b"%PDF-compiled")
+    blocker = threading.Event()
+
+    with patch("prerender.generate_resume_pdf", fake_generate()):
+        for _ in range(app_prerenderer._executor._max_workers):
+            app_prerenderer._executor.submit(blocker.wait, 5)
+        try:
+            client.post("/api/prerender", json=sample_resume_data)
+            started = time.monotonic()
+            response = client.post("/api/generate-pdf", json=sample_resume_data)
+        finally:
+            blocker.set()
+
+    assert response.data == b"%PDF-compiled"
+    assert time.monotonic() - started < 1
+    mock_generate_pdf.assert_called_once()
+
+
+def test_prerender_route_is_rate_limited(client, sample_resume_data):
+    """Test that drafts count against the per-client rate limit."""
+    with patch("app.rate_limiter", TokenBucketRateLimiter(rate=0.01, burst=1)), patch(
+        "app.prerenderer.submit", return_value="scheduled"
+    ) as submit:
+        first = client.post("/api/prerender", json=sample_resume_data)
+        second = client.post("/api/prerender", json=sample_resume_data)
+
+    assert first.status_code == 202
+    assert second.status_code == 429
+    assert submit.call_count == 1
+
+
+def test_prerender_route_reports_dropped_drafts(client, sample_resume_data):
+    """Test that a draft dropped by a full backlog is not reported as accepted."""
+    with patch("app.prerenderer.submit", return_value="dropped"):
+        response = client.post("/api/prerender", json=sample_resume_data)
+
+    assert response.status_code == 503
+    assert response.json["status"] == "dropped"
+    assert response.headers["Retry-After"] == "1"
+
+
+@patch("app.generate_resume_pdf")
+def test_download_uses_prerendered_pdf(mock_generate_pdf, client, sample_resume_data):
+    """Test that the download after a prerender does not compile again."""
+    with patch("prerender.generate_resume_pdf", fake_generate()):
+        response = client.post(
+            "/api/prerender", json=sample_resume_data, headers={"X-Session-ID": "abc"}
+        )
+        assert response.status_code == 202
+        assert response.json["status"] in ("scheduled", "pending", "cached")
+
+        response = client.post("/api/generate-pdf", json=sample_resume_data)
+
+    assert response.status_code == 200
+    assert response.data == b"%PDF-prerendered"
+    mock_generate_pdf.assert_not_called()
+
+
+@patch("app.generate_resume_pdf")
+def test_download_populates_cache(
+    mock_generate_pdf, client, sample_resume_data, tmp_path
+):
+    """Test that a compiled download is cached for the next identical request."""
+    mock_generate_pdf.side_effect = fake_generate(b"%PDF-compiled")
+
+    first = client.post("/api/generate-pdf", json=sample_resume_data)
+    second = client.post("/api/generate-pdf", json=sample_resume_data)
+
+    assert first.data == second.data == b"%PDF-compiled"
+    assert mock_generate_pdf.call_count == 1
+
+
+def test_prerender_requires_data(client):
+    """Test that an empty draft is rejected."""
+    response = client.post("/api/prerender", json={})
+    assert response.status_code == 400
@@ -0,0 +1,177 @@
+import os
+import pstats
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import app
+from profiling import Profiler, profiler, valid_request_id
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask app."""
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def profiling_on(tmp_path):
+    """Enable token-triggered profiling into a temporary directory."""
+    with patch.object(profiler, "token", "secret"), patch.object(
+        profiler, "output_dir", str(tmp_path)
+    ):
+        yield tmp_path
+
+
+def test_profiler_disabled_by_default():
+    """Test that profiling is off unless a token or sample rate is configured."""
+    assert Profiler("/tmp/unused").enabled is False
+    assert Profiler("/tmp/unused", sample_rate=0.1).enabled is True
+    assert Profiler("/tmp/unused", token="t").enabled is True
+
+
+def test_profiler_authorization():
+    """Test that only the configured token authorizes profiling."""
+    configured = Profiler("/tmp/unused", token="secret")
+    assert configured.authorized("secret") is True
+    assert configured.authorized("wrong") is False
+    assert configured.authorized(None) is False
+    assert Profiler("/tmp/unused").authorized("") is False
+
+
+def test_valid_request_id():
+    """Test that request ids are restricted to safe file names."""
+    assert valid_request_id("abc-123_x.y")
+    assert not valid_request_id("../etc/passwd")
+    assert not valid_request_id("..")
+    assert not valid_request_id(".hidden")
+    assert not valid_request_id("")
+    assert not valid_request_id(None)
+
+
+def test_request_id_header_round_trip(client):
+    """Test that the request id is echoed back or generated."""
+    response = client.get("/", headers={"X-Request-ID": "req-1"})
+    assert response.headers["X-Request-ID"] == "req-1"
+
+    response = client.get("/")
+    assert len(response.headers["X-Request-ID"]) == 32
+
+
+@patch("pdf_generation.subprocess.run")
+def test_profiled_request_writes_artifacts(
+    mock_run, client, profiling_on, sample_resume_data
+):
+    """Test that a token-triggered request saves pstats, stacks and TeX timings."""
+
+    def fake_pdflatex(command, **kwargs):
+        output_dir = command[3]
+        with open(os.path.join(output_dir, "resume.log"), "w") as f:
+            f.write("This is pdfTeX\n")
+        with open(os.path.join(output_dir, "resume.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4 test")
+        return MagicMock(returncode=0, stdout="", stderr="")
+
+    mock_run.side_effect = fake_pdflatex
+
+    response = client.post(
+        "/api/generate-pdf",
+        json=sample_resume_data,
+        headers={"X-Profile-Token": "secret", "X-Request-ID": "slow-one"},
+    )
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    assert len(profile_id) == 32
+
+    artifact_dir = profiling_on / profile_id
+    stats = pstats.Stats(str(artifact_dir / "profile.pstats"))
+    assert stats.total_calls > 0
+    assert (artifact_dir / "stacks.collapsed").exists()
+    assert (artifact_dir / "pdflatex.log").read_text() == "This is pdfTeX\n"
+    summary = (artifact_dir / "summary.json").read_text()
+    assert '"returncode": 0' in summary
+    assert '"request_id": "slow-one"' in summary
+
+    # Artifacts are retrievable by profile id with the token
+    response = client.get(
+        f"/api/profiles/{profile_id}/pdflatex-log",
+        headers={"X-Profile-Token": "secret"},
+    )
+    assert response.status_code == 200
+    assert response.data == b"This is pdfTeX\n"
+
+
+def test_profile_retrieval_requires_token(client, profiling_on):
+    """Test that profile artifacts are hidden without the token."""
+    response = client.get("/api/profiles/slow-one/summary")
+    assert response.status_code == 404
+
+    response = client.get(
+        "/api/profiles/missing/summary", headers={"X-Profile-Token": "secret"}
+    )
+    assert response.status_code == 404
+
+
+def test_request_without_token_is_not_profiled(client, profiling_on):
+    """Test that requests are only profiled when triggered."""
+    response = client.get("/", headers={"X-Request-ID": "plain"})
+    assert "X-Profile-Id" not in response.headers
+    assert not (profiling_on / "plain").exists()
+
+
+def test_client_request_ids_do_not_name_profiles(client, profiling_on):
+    """Test that a hostile or reused X-Request-ID cannot pick the artifact directory."""
+    ids = set()
+    for request_id in ("..", "shared"):
+        response = client.get(
+            "/", headers={"X-Profile-Token": "secret", "X-Request-ID": request_id}
+        )
+        ids.add(response.headers["X-Profile-Id"])
+    response = client.get(
+        "/", headers={"X-Profile-Token": "secret", "X-Request-ID": "shared"}
+    )
+    ids.add(response.headers["X-Profile-Id"])
+
+    assert len(ids) == 3
+    assert sorted(os.listdir(profiling_on)) == sorted(ids)
+    assert not (profiling_on.parent / "summary.json").exists()
+
+
+def test_profiles_are_pruned(tmp_path):
+    """Test that only the newest profiles are kept."""
+    limited = Profiler(str(tmp_path), token="t", max_profiles=2)
+    for request_id in ("a", "b", "c"):
+        limited.start(request_id)
+        limited.finish()
+
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_prune_skips_profiles_removed_by_another_worker(tmp_path):
+    """Test that a profile deleted mid-prune by another worker is ignored."""
+    limited = Profiler(str(tmp_path), token="t", max_profiles=1)
+    real_getmtime = os.path.getmtime
+
+    def vanished(path):
+        if path.endswith("gone"):
+            raise FileNotFoundError(path)
+        return real_getmtime(path)
+
+    (tmp_path / "gone").mkdir()
+    limited.start("a")
+    with patch("profiling.os.path.getmtime", side_effect=vanished):
+        assert limited.finish() is not None
+
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_profile_save_failure_does_not_fail_request(client, profiling_on):
+    """Test that a request succeeds even when its profile cannot be written."""
+    with patch("profiling.RequestProfile.save", side_effect=OSError("disk full")):
+        response = client.get("/", headers={"X-Profile-Token": "secret"})
+
+    assert response.status_code == 200
@@ -0,0 +1,109 @@
+import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import app
+from pdf_generation import generate_resume_pdf
+from reproducible import normalize_pdf, reproducible_env
+
+SAMPLE_PDF = (
+    b"%PDF-1.5\n1 0 obj\n<< /Producer (pdfTeX-1.40.25) "
+    b"/CreationDate (D:20241019101010+02'00') /ModDate (D:20241019101011+02'00') >>\n"
+    b"endobj\ntrailer\n<< /Size 2 /Info 1 0 R "
+    b"/ID [<8F3A0B1C2D3E4F5A6B7C8D9E0F1A2B3C> <8F3A0B1C2D3E4F5A6B7C8D9E0F1A2B3C>] >>\n"
+    b"startxref\n123\n%%EOF\n"
+)
+
+
+def test_normalize_pdf_pins_dates_and_id():
+    """Test that dates and the trailer ID are rewritten from the digest."""
+    normalized = normalize_pdf(SAMPLE_PDF, "ABCDEF" * 11, epoch=0)
+
+    assert b"/CreationDate (D:19700101000000Z)" in normalized
+    assert b"/ModDate (D:19700101000000Z)" in normalized
+    assert b"<ABCDEFABCDEFABCDEFABCDEFABCDEFAB>" in normalized
+    assert b"8F3A0B1C" not in normalized
+
+
+def test_normalize_pdf_preserves_offsets():
+    """Test that normalization never changes the length of the file."""
+    normalized = normalize_pdf(SAMPLE_PDF, "0123456789ABCDEF" * 4)
+    assert len(normalized) == len(SAMPLE_PDF)
+    assert normalized.index(b"startxref") == SAMPLE_PDF.index(b"startxref")
+
+
+def test_normalize_pdf_is_stable():
+    """Test that the same digest gives the same bytes whatever the original metadata."""
+    other = SAMPLE_PDF.replace(b"20241019101010", b"20250101000000").replace(
+        b"8F3A0B1C", b"00000000"
+    )
+    digest = "FEDCBA9876543210" * 4
+    assert normalize_pdf(SAMPLE_PDF, digest) == normalize_pdf(other, digest)
+
+
+def test_reproducible_env_pins_source_date():
+    """Test that TeX is told to use a fixed date."""
+    env = reproducible_env()
+    assert env["FORCE_SOURCE_DATE"] == "1"
+    assert env["SOURCE_DATE_EPOCH"].isdigit()
+
+
+@patch("pdf_generation.subprocess.run")
+def test_generate_reproducible_normalizes_output(
+    mock_run, sample_resume_data, tmp_path
+):
+    """Test that reproducible mode passes the pinned environment and rewrites the PDF."""
+
+    def fake_pdflatex(command, **kwargs):
+        with open(os.path.join(command[-2], "resume.pdf"), "wb") as f:
+            f.write(SAMPLE_PDF)
+        return MagicMock(returncode=0)
+
+    mock_run.side_effect = fake_pdflatex
+
+    pdf_path = generate_resume_pdf(str(tmp_path), sample_resume_data, reproducible=True)
+
+    assert mock_run.call_args[1]["env"]["FORCE_SOURCE_DATE"] == "1"
+    with open(pdf_path, "rb") as f:
+        assert b"8F3A0B1C" not in f.read()
+
+
+def test_pdf_response_has_content_etag(sample_resume_data):
+    """Test that identical PDFs are served with the same content-derived ETag."""
+    with app.test_client() as client, patch(
+        "app.result_cache.get", return_value=b"%PDF-x"
+    ):
+        first = client.post("/api/generate-pdf", json=sample_resume_data)
+        second = client.post("/api/generate-pdf", json=sample_resume_data)
+
+    assert first.status_code == 200
+    assert first.headers["ETag"] == second.headers["ETag"]
+
+
+@pytest.mark.skipif(
+    shutil.which("pdflatex") is None, reason="pdflatex is not installed"
+)
+def test_repeated_and_parallel_compiles_are_identical(sample_resume_data, tmp_path):
+    """Test that real compiles of the same input produce identical bytes."""
+
+    def compile_once(index):
+        output_dir = tmp_path / f"run-{index}"
+        pdf_path = generate_resume_pdf(
+            str(output_dir), sample_resume_data, reproducible=True
+        )
+        with open(pdf_path, "rb") as f:
+            return f.read()
+
+    sequential = [compile_once(i) for i in range(2)]
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        parallel = list(executor.map(compile_once, range(2, 5)))
+
+    outputs = sequential + parallel
+    assert outputs[0].startswith(b"%PDF")
+    assert all(output == outputs[0] for output in outputs)
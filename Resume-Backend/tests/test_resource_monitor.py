@@ -0,0 +1,102 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import app
+from resource_monitor import TEMP_PREFIX, find_leaks, growth, sample_resources
+from soak_test import run_soak
+
+linux_only = pytest.mark.skipif(
+    not os.path.isdir("/proc/self/fd"), reason="needs /proc"
+)
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask app."""
+    with app.test_client() as client:
+        yield client
+
+
+def test_growth_of_flat_and_rising_series():
+    """Test that noise around a level grows little and a steady rise counts in full."""
+    assert growth([5, 6, 5, 6, 5, 6, 5, 6]) == pytest.approx(1 / 3)
+    assert growth([0, 1, 2, 3, 4]) == pytest.approx(4)
+    assert growth([7]) == 0.0
+
+
+def test_find_leaks_ignores_warmup_and_noise():
+    """Test that only counters rising after warm-up are reported."""
+    samples = [{"threads": 2, "temp_dirs": 0}] + [
+        {"threads": 10, "temp_dirs": index} for index in range(20)
+    ]
+    leaks = find_leaks(samples)
+    assert set(leaks) == {"temp_dirs"}
+    assert find_leaks(samples, tolerances={"temp_dirs": 100}) == {}
+
+
+@linux_only
+def test_sample_resources_counts_children_and_temp_dirs():
+    """Test that live children and our temporary directories are counted."""
+    before = sample_resources()
+    temp_dir = tempfile.mkdtemp(prefix=TEMP_PREFIX)
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        during = sample_resources()
+    finally:
+        child.kill()
+        child.wait()
+        shutil.rmtree(temp_dir)
+
+    assert during["temp_dirs"] == before["temp_dirs"] + 1
+    assert during["child_processes"] == before["child_processes"] + 1
+    assert during["open_fds"] >= 3
+    after = sample_resources()
+    assert after["temp_dirs"] == before["temp_dirs"]
+    assert after["child_processes"] == before["child_processes"]
+
+
+def test_self_check_endpoint(client):
+    """Test that the self-check endpoint reports resource counters and in-flight work."""
+    response = client.get("/api/self-check")
+    assert response.status_code == 200
+    assert set(response.json["resources"]) >= {"temp_dirs", "threads", "rss_bytes"}
+    assert response.json["in_flight"] == {"compiles": 0, "prerenders": 0}
+
+
+@linux_only
+@patch("pdf_generation.COMPILE_TIMEOUT", 0.5)
+@patch("app.result_cache.max_bytes", 0)
+def test_short_soak_has_no_leaks(fake_tex):
+    """Test a short mixed run of valid, invalid and hanging requests stays flat."""
+    samples, outcomes = run_soak(requests=60, concurrency=4, batch_size=10)
+
+    assert {kind for kind, _ in outcomes} == {"valid", "invalid", "hang"}
+    assert all(status == 500 for kind, status in outcomes if kind == "hang")
+    assert samples[-1]["child_processes"] == 0
+    assert samples[-1]["zombies"] == 0
+    assert find_leaks(samples) == {}
+
+
+@linux_only
+@patch("pdf_generation.COMPILE_TIMEOUT", 0.5)
+def test_soak_detects_leaked_temp_dirs(fake_tex):
+    """Test that the harness fails a run whose requests leave directories behind."""
+    before = set(os.listdir(tempfile.gettempdir()))
+    try:
+        # shutil.rmtree is one shared function, so clean up only after unpatching
+        with patch("app.shutil.rmtree"):
+            samples, _ = run_soak(requests=60, concurrency=4, batch_size=10)
+    finally:
+        for name in set(os.listdir(tempfile.gettempdir())) - before:
+            if name.startswith(TEMP_PREFIX):
+                shutil.rmtree(os.path.join(tempfile.gettempdir(), name))
+
+    assert "temp_dirs" in find_leaks(samples)
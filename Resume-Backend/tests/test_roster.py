@@ -0,0 +1,181 @@
+import io
+import os
+import sys
+import zipfile
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pypdf import PdfReader
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from admission import TokenBucketRateLimiter
+from app import app, roster_file_name
+from fake_tex import build_pdf
+from roster import ROSTER_COMPILE_TIMEOUT, generate_roster_pdf, parse_page_ranges
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask app."""
+    with app.test_client() as client:
+        yield client
+
+
+def fake_engine(page_counts):
+    """Build a subprocess.run stand-in that writes a PDF and roster page counts."""
+
+    def run(command, **kwargs):
+        output_dir, tex_file = command[-2], command[-1]
+        stem = os.path.splitext(os.path.basename(tex_file))[0]
+        lines = [f"ROSTER-PAGES:{i + 1}:{n}" for i, n in enumerate(page_counts)]
+        with open(os.path.join(output_dir, stem + ".log"), "w") as f:
+            f.write("\n".join(["This is pdfTeX"] + lines) + "\n")
+        with open(os.path.join(output_dir, stem + ".pdf"), "wb") as f:
+            f.write(build_pdf(stem, sum(page_counts)))
+        return MagicMock(returncode=0, stdout="", stderr="")
+
+    return run
+
+
+def test_parse_page_ranges():
+    """Test that page counts become consecutive 1-based ranges."""
+    log = "noise\nROSTER-PAGES:1:2\nmore\nROSTER-PAGES:2:1\nROSTER-PAGES:3:3\n"
+    assert parse_page_ranges(log, 3) == [(1, 2), (3, 3), (4, 6)]
+
+
+def test_parse_page_ranges_incomplete():
+    """Test that a log missing a resume yields no ranges."""
+    assert parse_page_ranges("ROSTER-PAGES:1:2\n", 2) is None
+
+
+@patch("pdf_generation.subprocess.run")
+def test_generate_roster_single_compile(mock_run, sample_resume_data, tmp_path):
+    """Test that the whole roster is rendered into one document and one compile."""
+    mock_run.side_effect = fake_engine([2, 1])
+    other = dict(sample_resume_data, name="Second & Person")
+
+    result = generate_roster_pdf(str(tmp_path), [sample_resume_data, other])
+
+    assert mock_run.call_count == 1
+    assert mock_run.call_args.kwargs["timeout"] == ROSTER_COMPILE_TIMEOUT
+    assert result["pdf_path"] == str(tmp_path / "roster.pdf")
+    assert result["page_ranges"] == [(1, 2), (3, 3)]
+
+    tex = (tmp_path / "roster.tex").read_text()
+    assert tex.count("\\begin{document}") == 1
+    assert tex.count("\\setcounter{page}{1}") == 2
+    assert "\\pdfbookmark[0]{Test User}{resume-1}" in tex
+    assert "\\pdfbookmark[0]{Second \\& Person}{resume-2}" in tex
+
+
+@patch("pdf_generation.subprocess.run")
+def test_generate_roster_split(mock_run, sample_resume_data, tmp_path):
+    """Test that splitting copies each page range into its own PDF."""
+    mock_run.side_effect = fake_engine([2, 1])
+
+    result = generate_roster_pdf(
+        str(tmp_path), [sample_resume_data, sample_resume_data], split=True
+    )
+
+    assert mock_run.call_count == 1
+    assert [len(PdfReader(path).pages) for path in result["split_paths"]] == [2, 1]
+    last = PdfReader(result["split_paths"][1]).pages[0].extract_text()
+    assert last.endswith("3")
+
+
+@patch("pdf_generation.subprocess.run")
+def test_generate_roster_split_rejects_short_pdf(
+    mock_run, sample_resume_data, tmp_path
+):
+    """Test that page ranges beyond the combined PDF fail the export."""
+
+    def short_pdf(command, **kwargs):
+        result = fake_engine([2, 1])(command, **kwargs)
+        with open(os.path.join(command[-2], "roster.pdf"), "wb") as f:
+            f.write(build_pdf("roster", 2))
+        return result
+
+    mock_run.side_effect = short_pdf
+    result = generate_roster_pdf(
+        str(tmp_path), [sample_resume_data, sample_resume_data], split=True
+    )
+    assert result is None
+
+
+@patch("pdf_generation.subprocess.run")
+def test_generate_roster_failure(mock_run, sample_resume_data, tmp_path):
+    """Test that a failed roster compile returns None."""
+    mock_run.return_value = MagicMock(returncode=1, stdout="", stderr="")
+    assert generate_roster_pdf(str(tmp_path), [sample_resume_data]) is None
+
+
+def test_roster_route_requires_resumes(client):
+    """Test that the roster endpoint rejects empty input."""
+    response = client.post("/api/generate-roster-pdf", json={"resumes": []})
+    assert response.status_code == 400
+    assert "error" in response.json
+
+
+@patch("app.ROSTER_MAX_RESUMES", 1)
+def test_roster_route_limits_size(client, sample_resume_data):
+    """Test that oversized rosters are rejected."""
+    response = client.post(
+        "/api/generate-roster-pdf", json={"resumes": [sample_resume_data] * 2}
+    )
+    assert response.status_code == 400
+
+
+@patch("pdf_generation.subprocess.run")
+def test_roster_route_returns_pdf_and_zip(mock_run, client, sample_resume_data):
+    """Test the combined PDF and the per-person archive responses."""
+    mock_run.side_effect = fake_engine([1, 1])
+    payload = {
+        "resumes": [sample_resume_data, dict(sample_resume_data, name="Jo Bloggs")]
+    }
+
+    response = client.post("/api/generate-roster-pdf", json=payload)
+    assert response.status_code == 200
+    assert response.mimetype == "application/pdf"
+    assert response.data.startswith(b"%PDF")
+
+    response = client.post("/api/generate-roster-pdf", json=dict(payload, split=True))
+    assert response.status_code == 200
+    assert response.mimetype == "application/zip"
+    names = zipfile.ZipFile(io.BytesIO(response.data)).namelist()
+    assert names == ["001-test-user.pdf", "002-jo-bloggs.pdf"]
+
+
+@patch("pdf_generation.subprocess.run")
+def test_roster_route_is_rate_limited(mock_run, client, sample_resume_data):
+    """Test that roster exports count against the per-client rate limit."""
+    mock_run.side_effect = fake_engine([1])
+    payload = {"resumes": [sample_resume_data]}
+
+    with patch("app.rate_limiter", TokenBucketRateLimiter(rate=0.01, burst=1)):
+        first = client.post("/api/generate-roster-pdf", json=payload)
+        second = client.post("/api/generate-roster-pdf", json=payload)
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert "Retry-After" in second.headers
+    assert mock_run.call_count == 1
+
+
+@patch("pdf_generation.subprocess.run")
+def test_roster_route_rejected_when_busy(mock_run, client, sample_resume_data):
+    """Test that roster exports wait for a roster slot and get 503 without one."""
+    with patch("app.roster_limiter.acquire", return_value=False):
+        response = client.post(
+            "/api/generate-roster-pdf", json={"resumes": [sample_resume_data]}
+        )
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    mock_run.assert_not_called()
+
+
+def test_roster_file_name():
+    """Test archive member names for odd or missing names."""
+    assert roster_file_name(0, {"name": "Zoë O'Neil"}) == "001-zo-o-neil.pdf"
+    assert roster_file_name(9, {}) == "010-resume.pdf"
@@ -0,0 +1,93 @@
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from serving_config import (
+    compute_serving_config,
+    current_rss,
+    load_serving_config,
+    read_cpu_limit,
+    read_memory_limit,
+)
+
+
+def test_read_cgroup_v2_limits(tmp_path):
+    """Test reading CPU and memory limits from cgroup v2 files."""
+    (tmp_path / "cpu.max").write_text("200000 100000\n")
+    (tmp_path / "memory.max").write_text("2147483648\n")
+
+    assert read_cpu_limit(str(tmp_path)) == 2.0
+    assert read_memory_limit(str(tmp_path)) == 2147483648
+
+
+def test_read_cgroup_v1_limits(tmp_path):
+    """Test reading CPU and memory limits from cgroup v1 files."""
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("50000")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000")
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "memory" / "memory.limit_in_bytes").write_text("1073741824")
+
+    assert read_cpu_limit(str(tmp_path)) == 0.5
+    assert read_memory_limit(str(tmp_path)) == 1073741824
+
+
+def test_unlimited_cgroup_falls_back(tmp_path):
+    """Test that unlimited quotas fall back to host CPUs and no memory limit."""
+    (tmp_path / "cpu.max").write_text("max 100000")
+    (tmp_path / "memory.max").write_text("max")
+
+    assert read_cpu_limit(str(tmp_path)) >= 1
+    assert read_memory_limit(str(tmp_path)) is None
+
+
+def test_compute_config_scales_with_cpus():
+    """Test that workers and compile slots follow the CPU quota."""
+    small = compute_serving_config(cpus=1, memory_bytes=2 * 1024**3)
+    large = compute_serving_config(cpus=4, memory_bytes=8 * 1024**3)
+
+    assert small["workers"] == 1
+    assert small["compile_slots"] == 1
+    assert large["workers"] == 4
+    assert large["workers"] * large["compile_slots"] == 4
+    assert large["worker_rss_limit"] < 8 * 1024**3 // 4
+
+
+def test_compute_config_memory_caps_workers():
+    """Test that a tight memory limit reduces the worker count."""
+    config = compute_serving_config(cpus=4, memory_bytes=1024**3)
+
+    assert config["workers"] < 4
+    assert config["workers"] * config["compile_slots"] >= 4
+
+
+def test_compute_config_timeout_follows_latency():
+    """Test that timeouts grow with measured compile latency."""
+    fast = compute_serving_config(cpus=1, compile_latency=1)
+    slow = compute_serving_config(cpus=1, compile_latency=20)
+
+    assert fast["timeout"] == 30
+    assert slow["timeout"] > fast["timeout"]
+    assert slow["worker_rss_limit"] is None
+
+
+def test_load_config_honours_environment():
+    """Test that explicit environment overrides win over derived values."""
+    env = {"COMPILE_LATENCY_SECONDS": "10", "GUNICORN_WORKERS": "3"}
+    with patch.dict(os.environ, env), patch(
+        "serving_config.read_cpu_limit", return_value=6.0
+    ), patch("serving_config.read_memory_limit", return_value=None):
+        config = load_serving_config()
+
+    assert config["workers"] == 3
+    assert config["compile_slots"] == 2
+    assert config["timeout"] == 60
+
+
+def test_current_rss_is_positive():
+    """Test that the RSS of the test process can be read."""
+    assert current_rss() > 0
@@ -0,0 +1,133 @@
+import io
+import json
+import logging
+import os
+import queue
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_generation import compile_latex_to_pdf
+from structured_logging import (
+    JsonFormatter,
+    RequestIdFilter,
+    StructuredQueueHandler,
+    parse_tex_error,
+    configure_logging,
+    request_id_var,
+    restart_logging,
+    shutdown_logging,
+)
+
+TEX_LOG = """This is pdfTeX, Version 3.141592653
+(./resume.tex
+! Undefined control sequence.
+l.97 \\badmacro
+               {text}
+Here is how much of TeX's memory you used:
+"""
+
+
+def test_parse_tex_error():
+    """Test that the first TeX error and its line number are extracted."""
+    error = parse_tex_error(TEX_LOG)
+    assert error["tex_error"] == "Undefined control sequence."
+    assert error["tex_line"] == 97
+    assert "\\badmacro" in error["tex_excerpt"]
+
+
+def test_parse_tex_error_without_error():
+    """Test that logs without errors yield None."""
+    assert parse_tex_error("Output written on resume.pdf (1 page).") is None
+    assert parse_tex_error("") is None
+    assert parse_tex_error(None) is None
+
+
+def test_json_formatter_includes_request_id_and_extra_fields():
+    """Test that records render as JSON with request id and extra fields."""
+    record = logging.LogRecord(
+        "resume.test", logging.INFO, __file__, 1, "hello %s", ("x",), None
+    )
+    token = request_id_var.set("req-42")
+    try:
+        RequestIdFilter().filter(record)
+    finally:
+        request_id_var.reset(token)
+    record.compile_seconds = 1.5
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "hello x"
+    assert entry["request_id"] == "req-42"
+    assert entry["compile_seconds"] == 1.5
+    assert entry["level"] == "INFO"
+
+
+@patch("pdf_generation.subprocess.run")
+def test_compile_failure_logs_tex_error(mock_run, tmp_path):
+    """Test that a failed compile logs the parsed TeX error instead of raw output."""
+    (tmp_path / "test.log").write_text(TEX_LOG)
+    mock_run.return_value = MagicMock(returncode=1, stdout="x" * 10000, stderr="")
+
+    with patch("pdf_generation.logger") as mock_logger:
+        assert compile_latex_to_pdf("test.tex", str(tmp_path)) is False
+
+    message = mock_logger.error.call_args[0][0]
+    extra = mock_logger.error.call_args[1]["extra"]
+    assert message == "LaTeX compilation failed"
+    assert extra["tex_error"] == "Undefined control sequence."
+    assert extra["tex_line"] == 97
+    assert extra["returncode"] == 1
+
+
+def test_queued_exception_keeps_traceback_out_of_message():
+    """Test that exceptions logged through the queue render as an "exception" field."""
+    log_queue = queue.SimpleQueue()
+    handler = StructuredQueueHandler(log_queue)
+    logger = logging.getLogger("resume.test_queue")
+    logger.addHandler(handler)
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Compile crashed for %s", "req-7")
+    finally:
+        logger.removeHandler(handler)
+
+    entry = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+    assert entry["message"] == "Compile crashed for req-7"
+    assert "ValueError: boom" in entry["exception"]
+    assert "Traceback" not in entry["message"]
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Send the ``resume`` logs to a file for the duration of the test."""
+    path = tmp_path / "app.log"
+    shutdown_logging()
+    with open(path, "w") as stream:
+        configure_logging(stream=stream)
+        try:
+            yield path
+        finally:
+            shutdown_logging()
+            configure_logging()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_worker_writes_logs_after_restart(log_file):
+    """Test that a worker forked from a configured master still writes its logs."""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            restart_logging()
+            logging.getLogger("resume.worker").info("from worker")
+            shutdown_logging()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+    entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert [entry["message"] for entry in entries] == ["from worker"]
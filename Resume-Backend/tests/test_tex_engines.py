@@ -0,0 +1,116 @@
+import os
+import shutil
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_generation import compile_latex_to_pdf, generate_resume_pdf
+from tex_engines import ENGINES, EngineRegistry, needs_unicode_engine
+
+
+def test_latin_input_stays_on_pdflatex():
+    """Test that Latin text, accents and typographic punctuation need no Unicode engine."""
+    data = {
+        "name": "José Müller-Łukasz",
+        "summary": "Résumé – “quoted” … 10€ naïve",
+        "skills": [{"title": "Languages", "skills": "Python, C\\#"}],
+        "count": 3,
+    }
+    assert needs_unicode_engine(data) is False
+
+
+@pytest.mark.parametrize(
+    "text", ["田中 太郎", "Ελένη", "Шевченко", "Ship it 🚀", "∑ metrics"]
+)
+def test_non_latin_input_needs_unicode_engine(text):
+    """Test that scripts and symbols outside the pdflatex set are detected."""
+    assert needs_unicode_engine({"experiences": [{"descriptions": [text]}]}) is True
+
+
+def test_registry_selects_unicode_engine_when_available():
+    """Test engine routing by input and installed engines."""
+    registry = EngineRegistry(ENGINES)
+    with patch("tex_engines.shutil.which", return_value="/usr/bin/lualatex"):
+        assert registry.select({"name": "Jane"}) == "pdflatex"
+        assert registry.select({"name": "田中"}) == "lualatex"
+
+
+def test_registry_falls_back_when_unicode_engine_missing():
+    """Test that pdflatex is used when no Unicode engine is installed."""
+    registry = EngineRegistry(ENGINES)
+    with patch("tex_engines.shutil.which", return_value=None):
+        assert registry.select({"name": "田中"}) == "pdflatex"
+
+
+def test_registry_records_per_engine_stats():
+    """Test that selections, failures and latency are tracked per engine."""
+    registry = EngineRegistry(ENGINES)
+    registry.record("lualatex", 2.0, True)
+    registry.record("lualatex", 4.0, True)
+    registry.record("lualatex", 9.0, False)
+
+    stats = registry.stats()
+    assert stats["lualatex"]["selected"] == 3
+    assert stats["lualatex"]["failures"] == 1
+    assert 2.0 < stats["lualatex"]["latency_ewma"] < 4.0
+    assert stats["pdflatex"]["selected"] == 0
+
+
+def test_registry_rejects_unknown_engine():
+    """Test that an unknown engine name raises an error."""
+    with pytest.raises(ValueError):
+        EngineRegistry(ENGINES).command("troff")
+
+
+@patch("pdf_generation.subprocess.run")
+def test_compile_uses_requested_engine(mock_run, tmp_path):
+    """Test that the compile command starts with the selected engine."""
+    mock_run.return_value = MagicMock(returncode=0)
+
+    assert compile_latex_to_pdf("test.tex", str(tmp_path), engine="lualatex") is True
+    cmd = mock_run.call_args[0][0]
+    assert cmd[0] == "lualatex"
+    assert cmd[-1] == "test.tex"
+
+
+@patch("pdf_generation.compile_latex_to_pdf")
+def test_generate_routes_unicode_payload(mock_compile, sample_resume_data, tmp_path):
+    """Test that generate_resume_pdf picks the engine from the sanitized payload."""
+    mock_compile.return_value = True
+    sample_resume_data["name"] = "田中 太郎"
+
+    with patch("tex_engines.shutil.which", return_value="/usr/bin/lualatex"), patch(
+        "pdf_generation.engine_registry", EngineRegistry(ENGINES)
+    ):
+        generate_resume_pdf(str(tmp_path), sample_resume_data)
+
+    assert mock_compile.call_args[1]["engine"] == "lualatex"
+    assert "田中" in (tmp_path / "resume.tex").read_text(encoding="utf-8")
+
+
+@pytest.mark.skipif(
+    shutil.which("lualatex") is None or shutil.which("pdffonts") is None,
+    reason="lualatex and pdffonts are not installed",
+)
+def test_unicode_resume_renders_every_glyph(sample_resume_data, tmp_path):
+    """Test that non-Latin text compiles with lualatex and embeds the fallback fonts."""
+    sample_resume_data["name"] = "田中 太郎"
+    sample_resume_data["summary"] = "Иван Петров, Ελένη 😀"
+
+    with patch("pdf_generation.engine_registry", EngineRegistry(ENGINES)):
+        pdf_path = generate_resume_pdf(str(tmp_path), sample_resume_data)
+
+    log = (tmp_path / "resume.log").read_text(encoding="utf-8", errors="replace")
+    assert log.startswith("This is LuaHBTeX") or log.startswith("This is LuaTeX")
+    assert "Missing character" not in log
+    fonts = subprocess.run(
+        ["pdffonts", pdf_path], capture_output=True, text=True, check=True
+    ).stdout
+    assert "LMRoman" in fonts
+    assert "NotoSerif-" in fonts
+    assert "NotoSerifCJK" in fonts
+    assert "NotoColorEmoji" in fonts
@@ -0,0 +1,219 @@
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import app, prerenderer
+from result_cache import cache_key
+from tracing import (
+    STATUS_ERROR,
+    FileExporter,
+    Tracer,
+    configured_exporter,
+    format_traceparent,
+    parse_traceparent,
+    tracer,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask app."""
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def trace_file(monkeypatch, tmp_path):
+    """Export spans from the shared tracer to a local file."""
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracer, "exporter", FileExporter(str(path)))
+    return path
+
+
+def read_spans(path):
+    tracer.flush()
+    spans = []
+    for line in path.read_text().splitlines():
+        for resource in json.loads(line)["resourceSpans"]:
+            for scope in resource["scopeSpans"]:
+                spans.extend(scope["spans"])
+    for span in spans:
+        span["attributes"] = {
+            item["key"]: next(iter(item["value"].values()))
+            for item in span["attributes"]
+        }
+    return {span["name"]: span for span in spans}
+
+
+def test_parse_traceparent():
+    """Test W3C trace context parsing, including invalid headers."""
+    header = f"00-{TRACE_ID}-{PARENT_ID}-01"
+    context = parse_traceparent(header)
+    assert context == (TRACE_ID, PARENT_ID)
+    assert parse_traceparent(None) is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+
+
+def test_spans_nest_and_record_errors(tmp_path):
+    """Test that child spans share the trace and failures set an error status."""
+    path = tmp_path / "traces.jsonl"
+    local = Tracer(FileExporter(str(path)), service_name="test")
+
+    with pytest.raises(RuntimeError):
+        with local.span("outer", size=3) as outer:
+            with local.span("inner") as inner:
+                assert inner.trace_id == outer.trace_id
+                assert inner.parent_id == outer.span_id
+                assert format_traceparent(inner).startswith(f"00-{outer.trace_id}-")
+            raise RuntimeError("boom")
+    local.flush()
+
+    resources = [
+        json.loads(line)["resourceSpans"][0] for line in path.read_text().splitlines()
+    ]
+    assert resources[0]["resource"]["attributes"][0]["value"] == {"stringValue": "test"}
+    spans = {
+        span["name"]: span
+        for resource in resources
+        for span in resource["scopeSpans"][0]["spans"]
+    }
+    assert spans["outer"]["status"]["code"] == STATUS_ERROR
+    assert spans["outer"]["attributes"] == [{"key": "size", "value": {"intValue": "3"}}]
+    assert "status" not in spans["inner"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_worker_exports_after_restart(tmp_path):
+    """Test that a worker forked after the exporter thread started still exports."""
+    path = tmp_path / "traces.jsonl"
+    local = Tracer(FileExporter(str(path)), service_name="test")
+    local.start_span("master").end()
+    local.flush()
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            local.restart()
+            local.start_span("worker").end()
+            local.flush()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+    names = [
+        span["name"]
+        for line in path.read_text().splitlines()
+        for span in json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    ]
+    assert names == ["master", "worker"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_child_restarts_exporter_by_itself(tmp_path):
+    """Test that a child that never called restart() still exports and flushes."""
+    path = tmp_path / "traces.jsonl"
+    local = Tracer(FileExporter(str(path)), service_name="test")
+    local.start_span("parent").end()
+    local.flush()
+
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            local.start_span("child").end()
+            os.write(write_end, b"1" if local.flush(timeout=5) else b"0")
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+    assert os.read(read_end, 1) == b"1"
+    assert '"child"' in path.read_text()
+
+
+def test_flush_gives_up_on_a_stuck_exporter():
+    """Test that flush returns after its timeout when the exporter hangs."""
+    release = threading.Event()
+
+    class StuckExporter:
+        def export(self, payload):
+            release.wait(5)
+
+    local = Tracer(StuckExporter(), service_name="test")
+    local.start_span("stuck").end()
+    started = time.monotonic()
+    try:
+        assert local.flush(timeout=0.1) is False
+    finally:
+        release.set()
+    assert time.monotonic() - started < 1
+    assert local.flush(timeout=5) is True
+
+
+def test_configured_exporter(monkeypatch, tmp_path):
+    """Test exporter selection from TRACE_EXPORTER."""
+    monkeypatch.setenv("TRACE_FILE", str(tmp_path / "t.jsonl"))
+    assert configured_exporter("none") is None
+    assert configured_exporter("file").path == str(tmp_path / "t.jsonl")
+    assert configured_exporter("otlp").url.endswith("/v1/traces")
+    with pytest.raises(ValueError):
+        configured_exporter("zipkin")
+
+
+def test_generate_pdf_trace(client, fake_tex, sample_resume_data, trace_file):
+    """Test that a download produces one trace covering every stage."""
+    response = client.post(
+        "/api/generate-pdf",
+        json=sample_resume_data,
+        headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"},
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Trace-Id"] == TRACE_ID
+
+    spans = read_spans(trace_file)
+    assert set(spans) >= {
+        "POST /api/generate-pdf",
+        "sanitize",
+        "render",
+        "compile",
+        "read-back",
+        "cleanup",
+    }
+    assert {span["traceId"] for span in spans.values()} == {TRACE_ID}
+
+    root = spans["POST /api/generate-pdf"]
+    assert root["parentSpanId"] == PARENT_ID
+    assert root["attributes"]["http.status_code"] == "200"
+    assert int(root["attributes"]["http.request_content_length"]) > 0
+    assert spans["sanitize"]["attributes"]["resume.experiences"] == "2"
+    assert spans["sanitize"]["attributes"]["resume.descriptions"] == "2"
+    assert spans["compile"]["attributes"]["tex.exit_code"] == "0"
+    assert spans["compile"]["attributes"]["pdf.pages"] == "1"
+    assert spans["read-back"]["parentSpanId"] == root["spanId"]
+
+
+def test_prerender_trace_crosses_queue(
+    client, fake_tex, sample_resume_data, trace_file
+):
+    """Test that background renders continue the trace of the request that queued them."""
+    response = client.post("/api/prerender", json=sample_resume_data)
+    assert response.status_code == 202
+
+    # The worker ends its span just after handing over the PDF
+    deadline = time.monotonic() + 10
+    while "prerender" not in read_spans(trace_file) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    spans = read_spans(trace_file)
+    request_span = spans["POST /api/prerender"]
+    assert spans["prerender"]["parentSpanId"] == request_span["spanId"]
+    assert spans["prerender"]["traceId"] == request_span["traceId"]
+    assert spans["compile"]["traceId"] == request_span["traceId"]
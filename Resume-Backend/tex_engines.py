@@ -0,0 +1,113 @@
+import logging
+import os
+import re
+import shutil
+import sys
+import threading
+
+logger = logging.getLogger("resume.tex_engines")
+
+# Command prefix for each supported engine; output options are appended per compile
+ENGINES = {
+    "pdflatex": ["pdflatex", "-interaction=nonstopmode"],
+    "lualatex": ["lualatex", "-interaction=nonstopmode"],
+}
+
+# Same command line, served by fake_tex.py instead of a TeX installation
+FAKE_ENGINE_COMMAND = [
+    sys.executable,
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_tex.py"),
+    "-interaction=nonstopmode",
+]
+
+DEFAULT_ENGINE = "pdflatex"
+UNICODE_ENGINE = "lualatex"
+
+# Characters pdflatex typesets with T1 fontenc, utf8 inputenc and textcomp:
+# Latin-1, Latin Extended-A and the common typographic punctuation
+_PDFTEX_SAFE = (
+    "\\x00-\\u017f"
+    "\\u2013\\u2014\\u2018\\u2019\\u201a\\u201c\\u201d\\u201e"
+    "\\u2020\\u2021\\u2022\\u2026\\u2030\\u2039\\u203a\\u20ac\\u2122"
+)
+_NEEDS_UNICODE_RE = re.compile(f"[^{_PDFTEX_SAFE}]")
+
+
+def needs_unicode_engine(data):
+    """Return True if any string in ``data`` has characters pdflatex cannot typeset."""
+    if isinstance(data, str):
+        return _NEEDS_UNICODE_RE.search(data) is not None
+    elif isinstance(data, list):
+        return any(needs_unicode_engine(item) for item in data)
+    elif isinstance(data, dict):
+        return any(needs_unicode_engine(value) for value in data.values())
+    return False
+
+
+class EngineRegistry:
+    """Tracks which engines are installed and per-engine compile statistics."""
+
+    def __init__(self, engines, smoothing=0.2):
+        self.engines = engines
+        self.smoothing = smoothing
+        self._available = {}
+        self._stats = {
+            name: {"selected": 0, "failures": 0, "latency_ewma": None}
+            for name in engines
+        }
+        self._lock = threading.Lock()
+
+    def command(self, engine):
+        if engine not in self.engines:
+            raise ValueError(f"Unknown TeX engine: {engine}")
+        return list(self.engines[engine])
+
+    def available(self, engine):
+        if engine not in self._available:
+            self._available[engine] = shutil.which(self.engines[engine][0]) is not None
+        return self._available[engine]
+
+    def select(self, data):
+        """Pick the cheapest engine that can typeset the sanitized ``data``."""
+        if not needs_unicode_engine(data):
+            return DEFAULT_ENGINE
+        if self.available(UNICODE_ENGINE):
+            return UNICODE_ENGINE
+        logger.warning(
+            "Input needs a Unicode engine but none is installed",
+            extra={"engine": UNICODE_ENGINE},
+        )
+        return DEFAULT_ENGINE
+
+    def record(self, engine, duration, success):
+        with self._lock:
+            stats = self._stats[engine]
+            stats["selected"] += 1
+            if not success:
+                stats["failures"] += 1
+                return
+            if stats["latency_ewma"] is None:
+                stats["latency_ewma"] = duration
+            else:
+                stats["latency_ewma"] = (
+                    self.smoothing * duration
+                    + (1 - self.smoothing) * stats["latency_ewma"]
+                )
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+def configured_engines(backend=None):
+    """Engine commands for the ``TEX_BACKEND`` setting: "tex" (default) or "fake"."""
+    backend = backend or os.environ.get("TEX_BACKEND", "tex")
+    if backend == "fake":
+        return {name: list(FAKE_ENGINE_COMMAND) for name in ENGINES}
+    if backend != "tex":
+        raise ValueError(f"Unknown TEX_BACKEND: {backend}")
+    return ENGINES
+
+
+# Shared registry used by the compile path
+engine_registry = EngineRegistry(configured_engines())
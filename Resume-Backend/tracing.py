@@ -0,0 +1,311 @@
+import atexit
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import queue
+import re
+import secrets
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import namedtuple
+
+logger = logging.getLogger("resume.tracing")
+
+# Span kinds and status codes as numbered in the OTLP protobuf schema
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CONSUMER = 5
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# W3C trace context: version-trace_id-parent_id-flags
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+SpanContext = namedtuple("SpanContext", ["trace_id", "span_id"])
+
+# Innermost open span on the current thread/context
+current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def parse_traceparent(header):
+    """SpanContext from a ``traceparent`` header, or None if absent or malformed."""
+    match = _TRACEPARENT_RE.match((header or "").strip().lower())
+    if not match:
+        return None
+    trace_id, span_id, _ = match.groups()
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return SpanContext(trace_id, span_id)
+
+
+def format_traceparent(span):
+    return f"00-{span.trace_id}-{span.span_id}-01"
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """One timed operation; ended by the tracer that started it."""
+
+    def __init__(self, tracer, name, trace_id, parent_id, kind, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.status = None
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    @property
+    def context(self):
+        return SpanContext(self.trace_id, self.span_id)
+
+    def set_attribute(self, key, value):
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def set_error(self, message):
+        self.status = STATUS_ERROR
+        self.status_message = str(message)
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.tracer._finish(self)
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status is not None:
+            span["status"] = {"code": self.status, "message": self.status_message}
+        return span
+
+
+def otlp_payload(spans, service_name):
+    """Spans as an OTLP/JSON ``ExportTraceServiceRequest``."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": service_name}}
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "resume"},
+                        "spans": [span.to_otlp() for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class FileExporter:
+    """Appends each batch to ``path`` as one line of OTLP/JSON.
+
+    The collector's ``otlpjsonfile`` receiver can replay the file later.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def export(self, payload):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+
+
+class OtlpHttpExporter:
+    """Posts batches to an OTLP/HTTP endpoint using the JSON encoding."""
+
+    def __init__(self, endpoint, timeout=5.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.timeout = timeout
+
+    def export(self, payload):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class Tracer:
+    """Creates spans and exports finished ones in batches from a background thread.
+
+    Without an exporter spans are still created, so trace ids propagate, but
+    nothing is recorded. A forked child gets its own queue and thread the
+    first time it finishes a span.
+    """
+
+    def __init__(
+        self,
+        exporter=None,
+        service_name="resume-backend",
+        max_queue=10000,
+        batch_size=256,
+    ):
+        self.exporter = exporter
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    @property
+    def enabled(self):
+        return self.exporter is not None
+
+    def start_span(self, name, parent=None, kind=SPAN_KIND_INTERNAL, attributes=None):
+        """Start a span under ``parent`` (a Span or SpanContext), else the current span."""
+        if parent is None:
+            parent = current_span.get()
+        if parent is None:
+            trace_id, parent_id = secrets.token_hex(16), None
+        else:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        return Span(self, name, trace_id, parent_id, kind, attributes)
+
+    @contextlib.contextmanager
+    def span(self, name, parent=None, kind=SPAN_KIND_INTERNAL, **attributes):
+        """Run the block inside a new current span, marking it failed on exceptions."""
+        span = self.start_span(name, parent, kind, attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            current_span.reset(token)
+            span.end()
+
+    def _finish(self, span):
+        if self.exporter is None:
+            return
+        if self._pid != os.getpid():
+            self.restart()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="trace-exporter", daemon=True
+                    )
+                    self._thread.start()
+
+    def restart(self):
+        """Drop the queue and exporter thread inherited from a parent process.
+
+        Only the forking thread survives fork, so a worker would otherwise
+        queue spans for a thread that no longer runs.
+        """
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            spans = [self._queue.get()]
+            while len(spans) < self.batch_size:
+                try:
+                    spans.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._export(spans)
+            for _ in spans:
+                self._queue.task_done()
+
+    def _export(self, spans):
+        try:
+            self.exporter.export(otlp_payload(spans, self.service_name))
+        except Exception as e:
+            logger.warning(
+                "Trace export failed", extra={"spans": len(spans), "error": str(e)}
+            )
+
+    def flush(self, timeout=5.0):
+        """Wait up to ``timeout`` seconds for finished spans to reach the exporter.
+
+        Returns False if spans were still queued when the time ran out, so an
+        unreachable collector cannot hang shutdown.
+        """
+        if self._thread is None or self._pid != os.getpid():
+            return True
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._thread.is_alive():
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+
+def configured_exporter(kind=None):
+    """Exporter for the ``TRACE_EXPORTER`` setting: "none" (default), "file" or "otlp"."""
+    kind = kind or os.environ.get("TRACE_EXPORTER", "none")
+    if kind == "none":
+        return None
+    if kind == "file":
+        return FileExporter(
+            os.environ.get(
+                "TRACE_FILE", os.path.join(tempfile.gettempdir(), "resume-traces.jsonl")
+            )
+        )
+    if kind == "otlp":
+        return OtlpHttpExporter(
+            os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318")
+        )
+    raise ValueError(f"Unknown TRACE_EXPORTER: {kind}")
+
+
+# Shared tracer used by the request path
+tracer = Tracer(
+    configured_exporter(),
+    service_name=os.environ.get("OTEL_SERVICE_NAME", "resume-backend"),
+)
+atexit.register(tracer.flush)